@@ -0,0 +1,45 @@
+import copy
+
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from apps.account.models import User
+from project import generations
+from project.lru import LRUCache
+
+token_cache = LRUCache(settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
+
+# Saving or deleting the user or one of their tokens bumps these generations
+# (apps.account.signals), in the shared cache so every worker sees it.
+AUTH_MODELS = (User, Token)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that remembers key -> (user, token) for a short TTL.
+
+    Each entry records the user's User/Token generations and is only used while
+    they are unchanged, so logout, password changes and deactivation revoke
+    cached tokens in every worker; that check is one shared-cache read instead
+    of the token query. Local entries are also dropped right away by the
+    signals. Each request gets its own copy of the cached user.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            user, token, generation = cached
+            if generations.get_many(AUTH_MODELS, user.pk) == generation:
+                return copy.copy(user), token
+            token_cache.delete(key)
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, (user, token, generations.get_many(AUTH_MODELS, user.pk)))
+        return copy.copy(user), token
+
+
+def invalidate_token(key):
+    token_cache.delete(key)
+
+
+def invalidate_user(user_id):
+    token_cache.delete_where(lambda entry: entry[0].pk == user_id)
@@ -0,0 +1,23 @@
+from operator import attrgetter
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from apps.account.authentication import invalidate_token, invalidate_user
+from apps.account.models import User
+from project import generations
+
+generations.track(User, owner=attrgetter('pk'))
+generations.track(Token)
+
+
+@receiver(post_delete, sender=Token)
+def drop_cached_token(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user_tokens(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
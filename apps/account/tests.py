@@ -1,3 +1,51 @@
-from django.test import TestCase
+from apps.account.authentication import CachedTokenAuthentication, token_cache
+from project.testing import OwnerTestCase
 
-# Create your tests here.
+
+class CachedTokenAuthenticationTests(OwnerTestCase):
+    token_auth = True
+
+    def setUp(self):
+        super().setUp()
+        token_cache.clear()
+
+    def test_repeat_requests_skip_the_token_lookup(self):
+        self.assertEqual(self.client.get('/api/expenses/').status_code, 200)
+        # The paginator's COUNT is cached too, and there are no expenses to select.
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/expenses/').status_code, 200)
+
+    def test_logout_revokes_the_cached_token(self):
+        self.client.get('/api/expenses/')
+        self.client.post('/api/account/logout/')
+        self.assertEqual(self.client.get('/api/expenses/').status_code, 401)
+
+    def test_password_change_drops_cached_entries(self):
+        self.client.get('/api/expenses/')
+        self.client.patch(
+            '/api/account/profile/', {'password': 'New-secret-2', 'password2': 'New-secret-2'}, format='json'
+        )
+        self.assertIsNone(token_cache.get(self.token.key))
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get('/api/expenses/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/expenses/').status_code, 401)
+
+    def test_revocation_reaches_workers_that_missed_the_signal(self):
+        self.client.get('/api/expenses/')
+        stale = token_cache.get(self.token.key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/account/logout/')
+        # This worker's entry survived: only the shared generation tells it apart.
+        token_cache.set(self.token.key, stale)
+        self.assertEqual(self.client.get('/api/expenses/').status_code, 401)
+
+    def test_each_request_gets_its_own_user(self):
+        authentication = CachedTokenAuthentication()
+        first, _ = authentication.authenticate_credentials(self.token.key)
+        first.first_name = 'Changed'
+        second, _ = authentication.authenticate_credentials(self.token.key)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.first_name, '')
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ExpenseConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.expense'
+
+    def ready(self):
+        from apps.expense import signals  # noqa: F401
@@ -0,0 +1,16 @@
+from django.db import migrations
+
+from project.fts import create_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense', '0008_hot_query_indexes'),
+    ]
+
+    operations = [
+        create_index('expenses', ['title', 'description']),
+        create_index('restaurants', ['name', 'location']),
+        create_index('spare_parts', ['name', 'location', 'description']),
+    ]
@@ -27,10 +27,22 @@ class Expense(BaseModel):
     class Meta:
         db_table = 'expenses'
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['user', 'date'], name='expenses_user_date'),
+            models.Index(fields=['user', 'category', 'date'], name='expenses_user_category_date'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.amount}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored title, for the title index (apps.expense.signals) to diff saves against.
+        if 'title' in field_names:
+            instance._loaded_title = instance.title
+        return instance
+
 class Restaurant(BaseModel):
     name = models.CharField(max_length=200)
     location = models.CharField(max_length=300)
@@ -1,30 +1,33 @@
 from rest_framework import serializers
 from apps.expense.models import Expense, ExpenseCategory, Restaurant, SparePart
+from project.sparse import SparseFieldsetMixin
+from project.timing import TimedSerializerMixin
 
-class ExpenseCategorySerializer(serializers.ModelSerializer):
+class ExpenseCategorySerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = ExpenseCategory
         fields = ['id', 'name', 'description', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
-class RestaurantSerializer(serializers.ModelSerializer):
+class RestaurantSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Restaurant
         fields = ['id', 'name', 'location', 'description', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
 
-class SparePartSerializer(serializers.ModelSerializer):
+class SparePartSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = SparePart
         fields = ['id', 'name', 'address', 'description', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
 
-class ExpenseSerializer(serializers.ModelSerializer):
+class ExpenseSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     restaurant_name = serializers.CharField(source='restaurant.name', read_only=True)
     spare_part_name = serializers.CharField(source='spare_part.name', read_only=True)
+    expandable_fields = ('transaction', 'spare_part')
     
     class Meta:
         model = Expense
@@ -49,21 +52,18 @@ class ExpenseSerializer(serializers.ModelSerializer):
     
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        if instance.transaction:
+        # Only the nested objects that survived ?fields= / ?expand= are filled in.
+        if 'transaction' in data:
             data['transaction'] = {
                 'id': instance.transaction.id,
                 'description': instance.transaction.description,
                 'withdraw': instance.transaction.withdraw,
                 'date': instance.transaction.date
-            }
-        else:
-            data['transaction'] = None
-        if instance.spare_part:
+            } if instance.transaction else None
+        if 'spare_part' in data:
             data['spare_part'] = {
                 'id': instance.spare_part.id,
                 'name': instance.spare_part.name,
                 'address': instance.spare_part.address,
-            }
-        else:
-            data['spare_part'] = None
+            } if instance.spare_part else None
         return data
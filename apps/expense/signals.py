@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from apps.expense import title_index
+from apps.expense.models import Expense, ExpenseCategory, Restaurant, SparePart
+from apps.revenue import changes
+from project import generations, pubsub
+
+generations.track(Expense, ExpenseCategory, Restaurant, SparePart)
+changes.track(Expense, ExpenseCategory, Restaurant, SparePart)
+pubsub.track('dashboard', Expense)
+
+
+@receiver(pre_save, sender=Expense)
+@receiver(pre_delete, sender=Expense)
+def remember_title_index_generation(sender, instance, **kwargs):
+    instance._title_index_generation = generations.get(Expense, instance.user_id)
+
+
+@receiver(post_save, sender=Expense)
+def update_title_index_on_save(sender, instance, created, **kwargs):
+    if created:
+        deltas = [(instance.title, 1)]
+    elif not hasattr(instance, '_loaded_title'):
+        # Title not loaded (deferred, or an instance built by hand): rebuild rather than query.
+        deltas = None
+    elif instance._loaded_title != instance.title:
+        deltas = [(instance._loaded_title, -1), (instance.title, 1)]
+    else:
+        deltas = []
+    title_index.adjust_on_commit(instance.user_id, instance._title_index_generation, deltas)
+    instance._loaded_title = instance.title
+
+
+@receiver(post_delete, sender=Expense)
+def update_title_index_on_delete(sender, instance, **kwargs):
+    title_index.adjust_on_commit(
+        instance.user_id, instance._title_index_generation,
+        [(getattr(instance, '_loaded_title', instance.title), -1)],
+    )
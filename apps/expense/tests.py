@@ -1,3 +1,300 @@
-from django.test import TestCase
+import asyncio
+import json
+import time
+from datetime import date
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.throttling import ScopedRateThrottle
+
+from apps.account.models import User
+from apps.expense import title_index
+from apps.expense.models import Expense, ExpenseCategory, Restaurant, SparePart
+from apps.expense.serializers import ExpenseSerializer
+from apps.expense.views import ExpenseViewSet
+from apps.revenue.models import CompanyAccount, Transaction
+from project import admission, generations
+from project.testing import OwnerTestCase
+
+
+class ExpenseQueryCountTests(OwnerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.account = CompanyAccount.objects.create(
+            user=cls.user, bank_name='Bank', account_number='001', branch_code='01', account_holder='Owner'
+        )
+        for i in range(5):
+            category = ExpenseCategory.objects.create(user=cls.user, name=f'Category {i}')
+            restaurant = Restaurant.objects.create(user=cls.user, name=f'Restaurant {i}', location='Tokyo')
+            spare_part = SparePart.objects.create(user=cls.user, name=f'Shop {i}', address='Osaka')
+            tx = Transaction.objects.create(
+                user=cls.user, company_account=cls.account, date=date(2024, 1, i + 1),
+                withdraw=Decimal('100'), balance=Decimal('0'), description=f'Payment {i}'
+            )
+            Expense.objects.create(
+                user=cls.user, title=f'Lunch {i}', amount=Decimal('100'), date=date(2024, 1, i + 1),
+                category=category, restaurant=restaurant, spare_part=spare_part, transaction=tx
+            )
+
+    def test_list_does_not_query_per_row(self):
+        # One COUNT for the paginator and one SELECT for the page.
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/expenses/')
+        self.assertEqual(response.status_code, 200)
+        first = response.data['results'][0]
+        self.assertEqual(first['category_name'], 'Category 4')
+        self.assertEqual(first['transaction']['description'], 'Payment 4')
+        self.assertEqual(first['spare_part']['address'], 'Osaka')
+
+    def test_values_list_matches_the_serializer(self):
+        Expense.objects.create(user=self.user, title='Bare', amount=Decimal('12.5'), date=date(2024, 2, 1))
+        response = self.client.get('/api/expenses/', {'pageSize': 100})
+        queryset = Expense.objects.filter(user=self.user).order_by('-date', '-id')
+        expected = json.loads(JSONRenderer().render(ExpenseSerializer(queryset, many=True).data))
+        self.assertEqual(json.loads(response.content)['results'], expected)
+
+    def test_search_does_not_query_per_row(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/expenses/', {'search': 'Shop'})
+        self.assertEqual(response.data['count'], 5)
+
+    def test_search_matches_related_names_through_the_index(self):
+        response = self.client.get('/api/expenses/', {'search': 'restaurant 3'})
+        self.assertEqual([row['title'] for row in response.data['results']], ['Lunch 3'])
+        response = self.client.get('/api/expenses/', {'search': 'unch 2'})
+        self.assertEqual([row['title'] for row in response.data['results']], ['Lunch 2'])
+
+    def test_available_transactions_does_not_query_per_row(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/expenses/available_transactions/', {'unlinked': 'false'})
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(response.data['results'][0]['company_account_name'], 'Bank')
+
+    def test_joined_table_edits_refresh_the_cached_count(self):
+        self.assertEqual(self.client.get('/api/expenses/', {'search': 'Renamed'}).data['count'], 0)
+        category = ExpenseCategory.objects.get(name='Category 2')
+        category.name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            category.save()
+        self.assertEqual(self.client.get('/api/expenses/', {'search': 'Renamed'}).data['count'], 1)
+
+    def test_linked_transaction_edits_change_the_etag(self):
+        etag = self.client.get('/api/expenses/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.filter(description='Payment 4').get().save()
+        response = self.client.get('/api/expenses/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class AvailableTransactionsTests(OwnerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        account = CompanyAccount.objects.create(
+            user=cls.user, bank_name='Bank', account_number='001', branch_code='01', account_holder='Owner'
+        )
+        cls.transactions = [
+            Transaction.objects.create(
+                user=cls.user, company_account=account, date=date(2024, 1, i + 1),
+                withdraw=Decimal('100'), balance=Decimal('0'), description=f'Payment {i}'
+            )
+            for i in range(15)
+        ]
+        cls.linked = cls.transactions[14]
+        Expense.objects.create(
+            user=cls.user, title='Fuel', amount=Decimal('100'), date=date(2024, 1, 15), transaction=cls.linked
+        )
+
+    def _ids(self, response):
+        return [row['id'] for row in response.data['results']]
+
+    def test_pages_follow_the_cursor(self):
+        first = self.client.get('/api/expenses/available_transactions/')
+        self.assertEqual(len(first.data['results']), 10)
+        self.assertNotIn(self.linked.id, self._ids(first))
+
+        second = self.client.get(first.data['next'])
+        self.assertEqual(len(second.data['results']), 4)
+        self.assertIsNone(second.data['next'])
+        self.assertFalse(set(self._ids(first)) & set(self._ids(second)))
+
+    def test_current_transaction_stays_selectable(self):
+        response = self.client.get('/api/expenses/available_transactions/', {'current': self.linked.id})
+        self.assertEqual(self._ids(response)[0], self.linked.id)
+
+    def test_malformed_ids_are_rejected(self):
+        for params in ({'current': 'abc'}, {'account_id': '1.5'}):
+            response = self.client.get('/api/expenses/available_transactions/', params)
+            self.assertEqual(response.status_code, 400)
+
+
+class ExpenseTitleIndexTests(OwnerTestCase):
+    def _expense(self, title):
+        return Expense.objects.create(user=self.user, title=title, amount=Decimal('1'), date=date(2024, 1, 1))
+
+    def test_prefix_matches_are_ranked_by_frequency(self):
+        self._expense('Highway')
+        for _ in range(3):
+            self._expense('Hotel')
+        self._expense('Lunch')
+
+        self.client.get('/api/expenses/search_titles/', {'q': 'h'})
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/expenses/search_titles/', {'q': 'H'})
+        self.assertEqual(response.data, ['Hotel', 'Highway'])
+
+    def test_index_follows_saves_and_deletes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            lunch = self._expense('Lunch')
+        self.assertEqual(title_index.search(self.user.id, 'lu'), ['Lunch'])
+
+        lunch.title = 'Dinner'
+        # The UPDATE and its change-log row only: the previous title is the one the instance was loaded with.
+        with self.assertNumQueries(2), self.captureOnCommitCallbacks(execute=True):
+            lunch.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(title_index.search(self.user.id, 'lu'), [])
+            self.assertEqual(title_index.search(self.user.id, 'di'), ['Dinner'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            lunch.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(title_index.search(self.user.id, 'di'), [])
+
+    def test_index_is_patched_only_once_the_write_commits(self):
+        title_index.search(self.user.id, 'lu')
+        with self.captureOnCommitCallbacks(execute=False):
+            self._expense('Lunch')
+        self.assertEqual(title_index.search(self.user.id, 'lu'), [])
+
+    def test_concurrent_writers_force_a_rebuild(self):
+        title_index.search(self.user.id, 'd')
+        # Both writes start from the same generation; the second to commit finds the index moved.
+        with self.captureOnCommitCallbacks() as first:
+            self._expense('Dinner')
+        with self.captureOnCommitCallbacks() as second:
+            self._expense('Diner')
+        for callback in first + second:
+            callback()
+        with self.assertNumQueries(1):
+            self.assertEqual(sorted(title_index.search(self.user.id, 'd')), ['Diner', 'Dinner'])
+
+
+class ExpenseTitleIndexBatchTests(OwnerTestCase):
+    token_auth = True
+
+    def test_rolled_back_titles_are_not_cached(self):
+        response = self.client.post('/api/batch/', {'atomic': True, 'requests': [
+            {'method': 'POST', 'path': '/api/expenses/', 'body': {'title': 'Phantom', 'amount': '1', 'date': '2024-01-01'}},
+            {'method': 'GET', 'path': '/api/expenses/search_titles/?q=ph'},
+            {'method': 'GET', 'path': '/api/nope/'},
+        ]}, format='json')
+        created, found, _ = response.json()['responses']
+        self.assertTrue(response.json()['rolled_back'])
+        self.assertEqual(created['status'], 201)
+        self.assertEqual(found['body'], ['Phantom'])
+
+        self.assertEqual(self.client.get('/api/expenses/search_titles/', {'q': 'ph'}).json(), [])
+
+
+class ExpenseTitleIndexAutocommitTests(TransactionTestCase):
+    """Writes outside a transaction: each generation bump has run by the time post_save fires."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='owner', email='owner@example.com', password='secret')
+
+    def test_index_is_moved_to_the_new_generation(self):
+        lunch = Expense.objects.create(user=self.user, title='Lunch', amount=Decimal('1'), date=date(2024, 1, 1))
+        self.assertEqual(title_index.search(self.user.id, 'lu'), ['Lunch'])
+        previous = generations.get(Expense, self.user.id)
+
+        lunch.title = 'Dinner'
+        lunch.save()
+        self.assertNotEqual(generations.get(Expense, self.user.id), previous)
+        self.assertEqual(cache.get(title_index._cache_key(self.user.id)), [('dinner', 'Dinner', 1)])
+        self.assertIsNone(cache.get(title_index._cache_key(self.user.id, previous)))
+
+        lunch.delete()
+        self.assertEqual(cache.get(title_index._cache_key(self.user.id)), [])
+
+    def test_writes_sharing_a_transaction_are_all_indexed(self):
+        Expense.objects.create(user=self.user, title='Lunch', amount=Decimal('1'), date=date(2024, 1, 1))
+        self.assertEqual(title_index.search(self.user.id, 'lu'), ['Lunch'])
+
+        with transaction.atomic():
+            for title in ('Dinner', 'Diner'):
+                Expense.objects.create(user=self.user, title=title, amount=Decimal('1'), date=date(2024, 1, 1))
+        self.assertEqual(sorted(title_index.search(self.user.id, 'd')), ['Diner', 'Dinner'])
+
+
+class ExpenseQueryPlanTests(OwnerTestCase):
+    """Hot per-user queries must be answered from a composite index, not a table scan."""
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertRegex(plan, rf'USING (COVERING )?INDEX {index_name}\b', plan)
+
+    def view_queryset(self, **params):
+        view = ExpenseViewSet()
+        view.request = SimpleNamespace(user=self.user, query_params=params)
+        return view.get_queryset()
+
+    def test_expense_list(self):
+        self.assertUsesIndex(self.view_queryset()[:10], 'expenses_user_date')
+
+    def test_expense_list_by_category(self):
+        self.assertUsesIndex(self.view_queryset(category='1')[:10], 'expenses_user_category_date')
+
+    def test_expense_date_range(self):
+        queryset = Expense.objects.filter(user=self.user, date__range=['2024-01-01', '2024-01-31'])
+        self.assertUsesIndex(queryset, 'expenses_user_date')
+
+
+class HeavyEndpointAdmissionTests(OwnerTestCase):
+    url = '/api/expenses/bulk-import-xls-expenses/'
+
+    def test_saturated_endpoint_answers_429_with_retry_after(self):
+        gate = admission.gate('bulk_import_xls_expenses')
+        gate.acquire()
+        try:
+            started = time.monotonic()
+            response = self.client.post(self.url)
+            waited = time.monotonic() - started
+        finally:
+            gate.release()
+        self.assertEqual(response.status_code, 429)
+        self.assertLess(waited, settings.ADMISSION_QUEUE_TIMEOUT)
+        self.assertEqual(response['Retry-After'], '10')
+        self.assertEqual(self.client.post(self.url).status_code, 400)
+
+    async def test_async_waiters_leave_the_executor_free(self):
+        release = asyncio.Event()
+
+        @admission.admit('test')
+        async def view():
+            await release.wait()
+
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=2))
+        with self.settings(ADMISSION_LIMITS={'test': 1}):
+            calls = [asyncio.ensure_future(view()) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            # More waiters than executor workers, yet work handed to the executor still runs.
+            self.assertEqual(await asyncio.wait_for(loop.run_in_executor(None, str, 'built'), 1), 'built')
+            release.set()
+            await asyncio.gather(*calls)
+
+    def test_per_user_throttle_scope(self):
+        with mock.patch.object(ScopedRateThrottle, 'THROTTLE_RATES', {'import': '1/min'}):
+            self.assertEqual(self.client.post(self.url).status_code, 400)
+            self.assertEqual(self.client.post(self.url).status_code, 429)
+            self.assertEqual(self.client.get('/api/expenses/').status_code, 200)
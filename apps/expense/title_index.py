@@ -0,0 +1,112 @@
+"""Per-user expense title index used by ExpenseViewSet.search_titles.
+
+Each user's distinct titles are kept in the cache as a list of
+``(lowercased title, title, count)`` tuples sorted by the lowercased title, so
+a prefix lookup is two bisects plus a top-N pick by count. The index is built
+on first use and then patched by the Expense save/delete signals. Inside an
+atomic batch (``generations.bypassed()``) it is built from the transaction's
+own rows and not cached.
+
+The index is keyed by the user's Expense generation (project.generations).
+Once a write commits and bumps the generation, ``adjust`` moves the index from
+the generation the write started from to the new one, applying the title
+change. An index already moved by another write is not found under the old
+key, so the patch is dropped along with the current index and the next search
+rebuilds; so do writes that bump the generation without signals
+(``bulk_create``, ``update``).
+"""
+from bisect import bisect_left
+from functools import partial
+from heapq import nlargest
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from apps.expense.models import Expense
+from project import generations
+
+CACHE_KEY = 'expense_title_index:{user_id}:{generation}'
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _cache_key(user_id, generation=None):
+    if generation is None:
+        generation = generations.get(Expense, user_id)
+    return CACHE_KEY.format(user_id=user_id, generation=generation)
+
+
+def build_index(user_id):
+    rows = (
+        Expense.objects.filter(user_id=user_id)
+        .values('title')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    index = sorted((row['title'].lower(), row['title'], row['count']) for row in rows)
+    if not generations.bypassed():
+        cache.set(_cache_key(user_id), index, CACHE_TIMEOUT)
+    return index
+
+
+def get_index(user_id):
+    if generations.bypassed():
+        return build_index(user_id)
+    index = cache.get(_cache_key(user_id))
+    if index is None:
+        index = build_index(user_id)
+    return index
+
+
+def search(user_id, prefix, limit=10):
+    """Return up to ``limit`` titles starting with ``prefix``, most used first."""
+    index = get_index(user_id)
+    key = prefix.lower()
+    start = bisect_left(index, (key,))
+    end = bisect_left(index, (key + '\uffff',), lo=start)
+    best = nlargest(limit, index[start:end], key=lambda entry: entry[2])
+    return [title for _, title, _ in best]
+
+
+def _apply(index, title, delta):
+    key = (title.lower(), title)
+    pos = bisect_left(index, key)
+    if pos < len(index) and index[pos][:2] == key:
+        count = index[pos][2] + delta
+        if count > 0:
+            index[pos] = (key[0], title, count)
+        else:
+            del index[pos]
+    elif delta > 0:
+        index.insert(pos, (key[0], title, delta))
+
+
+def adjust(user_id, generation, deltas):
+    """Move the index built at ``generation`` to the current one, applying ``(title, delta)`` pairs.
+
+    ``deltas`` of None means the change is unknown: the index is dropped.
+    """
+    old_key = _cache_key(user_id, generation)
+    index = cache.get(old_key)
+    if index is None:
+        # Moved by another write: either a concurrent one, or an earlier write in
+        # the same transaction sharing this commit's generation, whose index now
+        # lacks this change.
+        cache.delete(_cache_key(user_id))
+        return
+    cache.delete(old_key)
+    if deltas is None:
+        return
+    for title, delta in deltas:
+        if title:
+            _apply(index, title, delta)
+    cache.set(_cache_key(user_id), index, CACHE_TIMEOUT)
+
+
+def adjust_on_commit(user_id, generation, deltas):
+    """``adjust`` the index built at ``generation`` once the current transaction commits.
+
+    ``generation`` must be read before the write (pre_save/pre_delete): in
+    autocommit mode the write's bump has already run by post_save.
+    """
+    transaction.on_commit(partial(adjust, user_id, generation, deltas))
@@ -6,8 +6,9 @@ from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.throttling import ScopedRateThrottle
 from django.db import transaction as db_transaction
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 from django.http import HttpResponse
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
@@ -16,14 +17,51 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 from reportlab.pdfbase.cidfonts import UnicodeCIDFont
 from reportlab.pdfbase import pdfmetrics
+from apps.expense import title_index
 from apps.expense.models import Expense, ExpenseCategory, Restaurant, SparePart
 from apps.expense.serializers import ExpenseSerializer, ExpenseCategorySerializer, RestaurantSerializer, SparePartSerializer
-from apps.revenue.models import CompanyAccount, Transaction
+from apps.revenue.filters import transaction_search_q
+from apps.revenue.models import CompanyAccount, Order, Transaction
 from apps.revenue.serializers import TransactionSerializer
 from apps.account.models import User
-from project.pagination import CustomPageNumberPagination
-
-class ExpenseCategoryViewSet(viewsets.ModelViewSet):
+from project import generations
+from project.admission import admit
+from project.conditional import ConditionalGetMixin, conditional
+from project.fast_lists import ValuesListMixin
+from project.fts import any_match, search_queryset
+from project.pagination import CachedCountPagination, ListPagination, TransactionKeysetPagination
+from project.timing import measure
+from project.write_lock import serialize_writes
+
+# Columns read by ExpenseSerializer (including its nested transaction/spare_part
+# dicts) and by the receipt/PDF exports, so list pages load in a single query.
+EXPENSE_RELATED_FIELDS = ('category', 'restaurant', 'spare_part', 'transaction')
+EXPENSE_LOAD_FIELDS = (
+    'id', 'title', 'amount', 'description', 'date', 'user', 'created_at', 'updated_at',
+    'category__id', 'category__name',
+    'restaurant__id', 'restaurant__name',
+    'spare_part__id', 'spare_part__name', 'spare_part__address',
+    'transaction__id', 'transaction__transaction_id', 'transaction__description',
+    'transaction__withdraw', 'transaction__date',
+)
+# values() fast path for the list endpoint (project.fast_lists).
+EXPENSE_LIST_FIELDS = (
+    ('id', 'id'), ('title', 'title'), ('amount', 'amount'), ('description', 'description'), ('date', 'date'),
+    ('category', 'category'), ('category_name', 'category__name'),
+    ('transaction', (
+        ('id', 'transaction__id'), ('description', 'transaction__description'),
+        ('withdraw', 'transaction__withdraw'), ('date', 'transaction__date'),
+    )),
+    ('restaurant', 'restaurant'), ('restaurant_name', 'restaurant__name'),
+    ('spare_part', (('id', 'spare_part__id'), ('name', 'spare_part__name'), ('address', 'spare_part__address'))),
+    ('spare_part_name', 'spare_part__name'), ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+)
+TRANSACTION_LOAD_FIELDS = (
+    'id', 'date', 'transaction_id', 'withdraw', 'deposit', 'balance', 'description', 'notes',
+    'created_at', 'updated_at', 'company_account__id', 'company_account__bank_name',
+)
+
+class ExpenseCategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = ExpenseCategorySerializer
     permission_classes = [IsAuthenticated]
 
@@ -36,17 +74,26 @@ class ExpenseCategoryViewSet(viewsets.ModelViewSet):
 
 
     @action(detail=False, methods=['get'])
+    @conditional
     def all(self, request):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        def build():
+            return self.get_serializer(self.get_queryset(), many=True).data
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+        return Response(generations.cached('expense_categories_all', request.user.id, [ExpenseCategory], build))
+
+class ExpenseViewSet(ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet):
     serializer_class = ExpenseSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ListPagination
+    keyset_ordering = ('-date', '-id')
+    etag_models = (Expense, ExpenseCategory, Restaurant, SparePart, Transaction)
+    list_fields = EXPENSE_LIST_FIELDS
+    throttle_scope = None
 
     def get_queryset(self):
-        queryset = Expense.objects.filter(user=self.request.user)
+        queryset = Expense.objects.filter(user=self.request.user).select_related(
+            *EXPENSE_RELATED_FIELDS
+        ).only(*EXPENSE_LOAD_FIELDS)
 
         category = self.request.query_params.get('category')
         date = self.request.query_params.get('date')
@@ -57,14 +104,18 @@ class ExpenseViewSet(viewsets.ModelViewSet):
         if date:
             queryset = queryset.filter(date=date)
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(category__name__icontains=search) |
-                Q(restaurant__name__icontains=search) |
-                Q(spare_part__name__icontains=search) |
-                Q(spare_part__address__icontains=search)
-            )
+            matches = any_match(search, pk='expenses', restaurant_id='restaurants', spare_part_id='spare_parts')
+            if matches is not None:
+                queryset = queryset.filter(matches | Q(category__name__icontains=search))
+            else:
+                queryset = queryset.filter(
+                    Q(title__icontains=search) |
+                    Q(description__icontains=search) |
+                    Q(category__name__icontains=search) |
+                    Q(restaurant__name__icontains=search) |
+                    Q(spare_part__name__icontains=search) |
+                    Q(spare_part__address__icontains=search)
+                )
 
         return queryset.order_by('-date', '-id')
 
@@ -115,12 +166,7 @@ class ExpenseViewSet(viewsets.ModelViewSet):
         if not query:
             return Response([])
         
-        titles = Expense.objects.filter(
-            user=request.user,
-            title__icontains=query
-        ).values_list('title', flat=True).distinct()[:10]
-        
-        return Response(list(titles))
+        return Response(title_index.search(request.user.id, query, limit=10))
 
     def _add_watermark(self, canvas, doc, text="INVOICE"):
             canvas.saveState()
@@ -143,9 +189,6 @@ class ExpenseViewSet(viewsets.ModelViewSet):
 
         if include_logo:
             logo_path = os.path.join(settings.MEDIA_ROOT, "logo.png")
-            print("MEDIA_ROOT:", settings.MEDIA_ROOT)
-            print("Logo path:", logo_path)
-            print("Exists:", os.path.exists(logo_path))
             if os.path.exists(logo_path):
                 logo = ImageReader(logo_path)
 
@@ -241,14 +284,16 @@ class ExpenseViewSet(viewsets.ModelViewSet):
             ('BOTTOMPADDING', (0, 0), (-1, -1), 8)
         ]))
         elements.append(detail_table)
-        doc.build(
-            elements,
-            onFirstPage=self._add_first_page_decorations,
-            onLaterPages=self._add_later_page_decorations,
-        )
+        with measure('render'):
+            doc.build(
+                elements,
+                onFirstPage=self._add_first_page_decorations,
+                onLaterPages=self._add_later_page_decorations,
+            )
         return response
 
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], throttle_classes=[ScopedRateThrottle], throttle_scope='export')
+    @admit('export_pdf')
     def export_pdf(self, request):
         pdfmetrics.registerFont(UnicodeCIDFont('HeiseiMin-W3'))
         user = request.user
@@ -383,39 +428,56 @@ class ExpenseViewSet(viewsets.ModelViewSet):
         ]))
         elements.append(table)
 
-        doc.build(
-            elements,
-            onFirstPage=self._add_first_page_decorations,
-            onLaterPages=self._add_later_page_decorations,
-        )
+        with measure('render'):
+            doc.build(
+                elements,
+                onFirstPage=self._add_first_page_decorations,
+                onLaterPages=self._add_later_page_decorations,
+            )
         return response
 
     @action(detail=False, methods=['get'])
     def available_transactions(self, request):
         search = request.query_params.get('search', '')
         date = request.query_params.get('date', '')
-        account_id = request.query_params.get('account_id', '')
-
-        queryset = Transaction.objects.filter(user=request.user)
-
+        unlinked = request.query_params.get('unlinked', 'true').lower() not in ('false', '0')
+        try:
+            account_id = int(request.query_params.get('account_id') or 0)
+            current = int(request.query_params.get('current') or 0)
+        except ValueError:
+            return Response({'error': 'account_id and current must be ids'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = Transaction.objects.filter(user=request.user).select_related(
+            'company_account'
+        ).only(*TRANSACTION_LOAD_FIELDS)
+
+        if unlinked:
+            # Anti-join: only transactions not yet used by an expense or order,
+            # plus the one already linked to the expense being edited.
+            unlinked_filter = ~Exists(Expense.objects.filter(transaction=OuterRef('pk'))) & ~Exists(
+                Order.objects.filter(transaction=OuterRef('pk'))
+            )
+            if current:
+                unlinked_filter |= Q(id=current)
+            queryset = queryset.filter(unlinked_filter)
         if account_id:
             queryset = queryset.filter(company_account_id=account_id)
         if search:
-            queryset = queryset.filter(
-                Q(description__icontains=search) |
-                Q(notes__icontains=search) |
-                Q(balance__icontains=search) |
-                Q(deposit__icontains=search) |
-                Q(withdraw__icontains=search)
-            )
+            queryset = queryset.filter(transaction_search_q(search, request.user))
         if date:
             queryset = queryset.filter(date=date)
 
-        serializer = TransactionSerializer(queryset, many=True)
-        return Response(serializer.data)
+        paginator = TransactionKeysetPagination()
+        # ?count=true counts through the anti-join, so links made from either side refresh it.
+        paginator.count_models = (Transaction, Expense, Order)
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = TransactionSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
-    @action(detail=False, methods=['post'], url_path='bulk-import-xls-expenses')
+    @action(detail=False, methods=['post'], url_path='bulk-import-xls-expenses', throttle_classes=[ScopedRateThrottle], throttle_scope='import')
+    @admit('bulk_import_xls_expenses')
+    @serialize_writes
     def bulk_import_xls_expenses(self, request):
         excel_file = request.FILES.get('file')
         if not excel_file:
@@ -536,39 +598,39 @@ class ExpenseViewSet(viewsets.ModelViewSet):
             )
         return Response(response_data, status=status.HTTP_200_OK)
 
-class RestaurantViewSet(viewsets.ModelViewSet):
+class RestaurantViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = RestaurantSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = CustomPageNumberPagination
+    pagination_class = CachedCountPagination
 
     def get_queryset(self):
         queryset = Restaurant.objects.filter(user=self.request.user)
         search = self.request.query_params.get('search', '')
         if search:
-            queryset = queryset.filter(
+            queryset = search_queryset(queryset, search, (
                 Q(name__icontains=search) |
                 Q(location__icontains=search)
-            )
+            ), ranked=True)
         return queryset
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
-class SparePartViewSet(viewsets.ModelViewSet):
+class SparePartViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = SparePartSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = CustomPageNumberPagination
+    pagination_class = CachedCountPagination
 
     def get_queryset(self):
         queryset = SparePart.objects.filter(user=self.request.user)
         search = self.request.query_params.get('search', '')
         if search:
-            queryset = queryset.filter(
+            queryset = search_queryset(queryset, search, (
                 Q(name__icontains=search) |
                 Q(address__icontains=search) |
                 Q(description__icontains=search)
-            )
+            ), ranked=True)
         return queryset
 
     def perform_create(self, serializer):
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class RevenueConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.revenue'
+
+    def ready(self):
+        from apps.revenue import signals  # noqa: F401
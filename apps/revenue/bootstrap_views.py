@@ -0,0 +1,50 @@
+"""``GET /api/bootstrap/``: every reference list the frontend loads at start-up, in one response.
+
+Each list is a ``values()`` query over the fields of the matching serializer,
+so rows have the same shape as the per-resource endpoints; the queries run
+through the async ORM and are awaited together. The bundle is cached under the
+combined generations of its tables, which also drive the ETag.
+"""
+import asyncio
+
+from apps.expense.models import ExpenseCategory, Restaurant, SparePart
+from apps.expense.serializers import ExpenseCategorySerializer, RestaurantSerializer, SparePartSerializer
+from apps.revenue.models import Auction, CarCategory, CompanyAccount, Customer, Saler
+from apps.revenue.serializers import (
+    AuctionSerializer, CarCategorySerializer, CompanyAccountSerializer, CustomerSerializer, SalerSerializer,
+)
+from project import generations
+from project.async_views import AsyncAPIView, json_response
+from project.conditional import ETagMixin, aconditional
+
+REFERENCE_LISTS = {
+    'car_categories': (CarCategory, CarCategorySerializer),
+    'expense_categories': (ExpenseCategory, ExpenseCategorySerializer),
+    'auctions': (Auction, AuctionSerializer),
+    'customers': (Customer, CustomerSerializer),
+    'salers': (Saler, SalerSerializer),
+    'company_accounts': (CompanyAccount, CompanyAccountSerializer),
+    'restaurants': (Restaurant, RestaurantSerializer),
+    'spare_parts': (SparePart, SparePartSerializer),
+}
+
+
+async def _reference_list(model, serializer, user):
+    return [row async for row in model.objects.filter(user=user).values(*serializer.Meta.fields)]
+
+
+async def build_bundle(user):
+    lists = await asyncio.gather(*(
+        _reference_list(model, serializer, user) for model, serializer in REFERENCE_LISTS.values()
+    ))
+    return dict(zip(REFERENCE_LISTS, lists))
+
+
+class BootstrapView(ETagMixin, AsyncAPIView):
+    etag_models = tuple(model for model, _ in REFERENCE_LISTS.values())
+
+    @aconditional
+    async def get(self, request):
+        return json_response(await generations.acached(
+            'bootstrap', request.user.id, self.etag_models, lambda: build_bundle(request.user)
+        ))
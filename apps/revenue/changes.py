@@ -0,0 +1,36 @@
+"""Per-user change feed for delta sync.
+
+Saves and deletes of tracked models append a ``Change`` row (table, pk, op)
+in the same transaction as the write. SQLite runs one write transaction at a
+time, so ``seq`` order is commit order and a client that has applied every
+change up to ``seq`` N never misses a later commit with a smaller ``seq``.
+Writes that bypass signals (``bulk_create``, ``QuerySet.update``) must call
+``record`` themselves.
+"""
+from operator import attrgetter
+
+from django.db.models.signals import post_delete, post_save
+
+from apps.revenue.models import Change
+
+
+def record(model, user_id, pks, op=Change.UPSERT):
+    if user_id is None:
+        return
+    table = model._meta.db_table
+    Change.objects.bulk_create(Change(user_id=user_id, table=table, object_id=pk, op=op) for pk in pks)
+
+
+def track(*models, owner=attrgetter('user_id')):
+    """Append an upsert on post_save and a tombstone on post_delete of each model."""
+
+    def saved(sender, instance, **kwargs):
+        record(sender, owner(instance), [instance.pk])
+
+    def deleted(sender, instance, **kwargs):
+        record(sender, owner(instance), [instance.pk], Change.DELETE)
+
+    for model in models:
+        label = model._meta.label_lower
+        post_save.connect(saved, sender=model, weak=False, dispatch_uid=f'changes:{label}:save')
+        post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=f'changes:{label}:delete')
@@ -0,0 +1,116 @@
+"""``GET /api/changes/?since=<seq>``: what changed for the user after ``seq``.
+
+Without ``since`` the response only carries the current ``seq``, which a
+client stores after a full load. With it, the feed is read in ``seq`` order
+(at most ``limit`` entries), collapsed to the last operation per row, and
+returned per table as full upserted rows (the per-resource serializer output)
+plus the ids of deleted rows. Rows that no longer exist are reported as
+deletes. ``has_more`` asks the client to call again with the returned ``seq``.
+"""
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.expense.models import Expense, ExpenseCategory, Restaurant, SparePart
+from apps.expense.serializers import (
+    ExpenseCategorySerializer, ExpenseSerializer, RestaurantSerializer, SparePartSerializer,
+)
+from apps.revenue.models import (
+    Auction, Car, CarCategory, Change, CompanyAccount, Customer, Order, OrderItem, Saler, Transaction,
+)
+from apps.revenue.serializers import (
+    AuctionSerializer, CarCategorySerializer, CarSerializer, CompanyAccountSerializer, CustomerSerializer,
+    OrderItemSerializer, OrderSerializer, SalerSerializer, TransactionSerializer,
+)
+
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 5000
+
+# table -> (queryset builder for the user, serializer)
+FEEDS = {
+    model._meta.db_table: (queryset, serializer)
+    for model, queryset, serializer in (
+        (Order, lambda user: Order.objects.filter(user=user).select_related(
+            'auction', 'customer', 'saler', 'company_account', 'transaction',
+        ).prefetch_related('items__car__category'), OrderSerializer),
+        (OrderItem, lambda user: OrderItem.objects.filter(order__user=user).select_related('car__category'),
+         OrderItemSerializer),
+        (Transaction, lambda user: Transaction.objects.filter(user=user), TransactionSerializer),
+        (Car, lambda user: Car.objects.filter(user=user).select_related('category'), CarSerializer),
+        (CarCategory, lambda user: CarCategory.objects.filter(user=user), CarCategorySerializer),
+        (Customer, lambda user: Customer.objects.filter(user=user), CustomerSerializer),
+        (Saler, lambda user: Saler.objects.filter(user=user), SalerSerializer),
+        (CompanyAccount, lambda user: CompanyAccount.objects.filter(user=user), CompanyAccountSerializer),
+        (Auction, lambda user: Auction.objects.filter(user=user), AuctionSerializer),
+        (Expense, lambda user: Expense.objects.filter(user=user).select_related(
+            'category', 'restaurant', 'spare_part', 'transaction',
+        ), ExpenseSerializer),
+        (ExpenseCategory, lambda user: ExpenseCategory.objects.filter(user=user), ExpenseCategorySerializer),
+        (Restaurant, lambda user: Restaurant.objects.filter(user=user), RestaurantSerializer),
+        (SparePart, lambda user: SparePart.objects.filter(user=user), SparePartSerializer),
+    )
+}
+
+
+def _non_negative_int(value, name):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = -1
+    if number < 0:
+        raise ValueError(f'{name} must be a non-negative integer.')
+    return number
+
+
+class ChangesView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        since = request.query_params.get('since')
+        try:
+            limit = min(_non_negative_int(request.query_params.get('limit', DEFAULT_LIMIT), 'limit'), MAX_LIMIT)
+            if since is not None:
+                since = _non_negative_int(since, 'since')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if since is None:
+            latest = Change.objects.filter(user=user).order_by('-seq').values_list('seq', flat=True).first()
+            return Response({'seq': latest or 0, 'has_more': False, 'changes': {}})
+
+        entries = list(
+            Change.objects.filter(user=user, seq__gt=since).order_by('seq')
+            .values_list('seq', 'table', 'object_id', 'op')[:limit + 1]
+        )
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        # Last operation wins for each row.
+        latest_ops = {}
+        for _, table, object_id, op in entries:
+            latest_ops[(table, object_id)] = op
+
+        changes = {}
+        for (table, object_id), op in latest_ops.items():
+            if table not in FEEDS:
+                continue
+            bucket = changes.setdefault(table, {'upserts': [], 'deletes': []})
+            bucket['upserts' if op == Change.UPSERT else 'deletes'].append(object_id)
+
+        for table, bucket in changes.items():
+            queryset, serializer = FEEDS[table]
+            ids = bucket['upserts']
+            if not ids:
+                continue
+            rows = list(queryset(user).filter(pk__in=ids).order_by('pk'))
+            bucket['upserts'] = serializer(rows, many=True).data
+            found = {row.pk for row in rows}
+            bucket['deletes'].extend(object_id for object_id in ids if object_id not in found)
+
+        return Response({
+            'seq': entries[-1][0] if entries else since,
+            'has_more': has_more,
+            'changes': changes,
+        })
@@ -0,0 +1,52 @@
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Q
+
+AMOUNT_FIELDS = ('withdraw', 'deposit', 'balance')
+CURRENCY_MARKS = re.compile(r'[¥￥$,\s円]')
+RANGE_SEPARATOR = re.compile(r'(?<=\d)\s*[-~〜]\s*(?=[-\d¥￥$])')
+
+
+def _parse_amount(value):
+    cleaned = CURRENCY_MARKS.sub('', value)
+    if not cleaned:
+        return None
+    try:
+        amount = Decimal(cleaned)
+    except InvalidOperation:
+        return None
+    return amount if amount.is_finite() else None
+
+
+def parse_amount_term(term):
+    """Return ``(low, high)`` if ``term`` is an amount such as ``12,000``, ``¥12000`` or ``12000-13000``."""
+    parts = RANGE_SEPARATOR.split(term.strip(), maxsplit=1)
+    amounts = [_parse_amount(part) for part in parts]
+    if None in amounts:
+        return None
+    low, high = amounts[0], amounts[-1]
+    return (low, high) if low <= high else (high, low)
+
+
+def transaction_search_q(term, user):
+    """Amount terms become exact/range matches on the amount columns, anything else a text search.
+
+    ``user`` is repeated inside every amount branch so SQLite can answer each
+    one from its ``(user, <amount>)`` index and union the results. A numeric
+    term also matches a ``transaction_id`` equal to it, through
+    ``(user, transaction_id)``.
+    """
+    amount_range = parse_amount_term(term)
+    if amount_range is None:
+        return (
+            Q(description__icontains=term) |
+            Q(notes__icontains=term) |
+            Q(transaction_id__icontains=term)
+        )
+    low, high = amount_range
+    if low == high:
+        lookups = [Q(user=user, **{field: low}) for field in AMOUNT_FIELDS]
+    else:
+        lookups = [Q(user=user, **{f'{field}__range': (low, high)}) for field in AMOUNT_FIELDS]
+    return lookups[0] | lookups[1] | lookups[2] | Q(user=user, transaction_id=term.strip())
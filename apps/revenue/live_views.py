@@ -0,0 +1,97 @@
+"""``GET /api/revenue/orders/dashboard/stream/``: the dashboard as Server-Sent Events.
+
+The stream opens with a ``snapshot`` event carrying the same payload as
+``orders/dashboard/``. Order and expense writes publish to the user's
+``dashboard`` channel (project.pubsub); each notification re-reads the cached
+dashboard and sends a ``delta`` event with the totals that changed and the
+orders that entered ``latest_orders``. When the latest orders changed in some
+other way (a delete or an edited date), a new ``snapshot`` is sent instead.
+
+Waiting is a plain ``await`` on the subscription queue, so idle connections
+hold no thread; the database is only touched after a notification. The
+response ends after ``SSE_MAX_AGE`` seconds and ``EventSource`` reconnects
+after ``retry`` milliseconds. ASGI only: under WSGI a stream would pin a worker.
+
+EventSource can't send headers, so the token may also be passed as ``?token=``.
+"""
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import exceptions
+
+from apps.account.authentication import CachedTokenAuthentication
+from apps.revenue.report_views import cached_dashboard_data
+from project import pubsub
+from project.renderers import ORJSONRenderer
+
+TOTALS = ('approved_amount', 'pending_amount', 'total_expense', 'total_purchase')
+RETRY_MS = 3000
+
+
+def dashboard_delta(previous, current):
+    """``(event, data)`` turning ``previous`` into ``current``, or None when nothing changed."""
+    if previous == current:
+        return None
+    new_orders = [order for order in current['latest_orders'] if order not in previous['latest_orders']]
+    merged = (new_orders + previous['latest_orders'])[:len(current['latest_orders'])]
+    if merged != current['latest_orders']:
+        return 'snapshot', current
+    delta = {name: current[name] for name in TOTALS if current[name] != previous[name]}
+    if new_orders:
+        delta['new_orders'] = new_orders
+    return 'delta', delta
+
+
+def sse_event(event, data):
+    return b'event: ' + event.encode('ascii') + b'\ndata: ' + ORJSONRenderer().render(data) + b'\n\n'
+
+
+async def dashboard_events(user):
+    deadline = time.monotonic() + settings.SSE_MAX_AGE
+    with pubsub.subscribe(('dashboard', user.pk)) as queue:
+        previous = await cached_dashboard_data(user)
+        yield b'retry: %d\n\n' % RETRY_MS + sse_event('snapshot', previous)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(queue.get(), min(settings.SSE_HEARTBEAT, remaining))
+            except asyncio.TimeoutError:
+                yield b': keep-alive\n\n'
+                continue
+            # Writes often come in bursts (an order and its items); one re-read covers them all.
+            while not queue.empty():
+                queue.get_nowait()
+            current = await cached_dashboard_data(user)
+            change = dashboard_delta(previous, current)
+            if change is not None:
+                previous = current
+                yield sse_event(*change)
+
+
+class DashboardStreamView(View):
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({'error': 'The dashboard stream is only served over ASGI'}, status=501)
+        key = request.GET.get('token')
+        header = request.headers.get('Authorization', '').split()
+        if len(header) == 2 and header[0].lower() == 'token':
+            key = header[1]
+        if not key:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+        try:
+            user, _ = await sync_to_async(CachedTokenAuthentication().authenticate_credentials)(key)
+        except exceptions.AuthenticationFailed as e:
+            return JsonResponse({'detail': str(e.detail)}, status=401)
+
+        response = StreamingHttpResponse(dashboard_events(user), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
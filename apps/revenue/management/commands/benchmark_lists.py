@@ -0,0 +1,102 @@
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from apps.account.models import User
+from apps.expense.models import Expense, ExpenseCategory, Restaurant, SparePart
+from apps.expense.views import ExpenseViewSet
+from apps.revenue.models import Car, CarCategory, CompanyAccount, Order, OrderItem, Transaction
+from apps.revenue.views import OrderViewSet, TransactionViewSet
+from project.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        'Rows/s of the orders, transactions and expenses lists: ModelSerializer + JSONRenderer '
+        'against the values() fast path + ORJSONRenderer. Seeds a throwaway user and rolls back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Rows seeded per list')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        with transaction.atomic():
+            user = self._seed(rows)
+            for name, viewset in (('orders', OrderViewSet), ('transactions', TransactionViewSet),
+                                  ('expenses', ExpenseViewSet)):
+                view = self._view(viewset, user)
+                serializer = self._time(repeat, lambda: JSONRenderer().render(
+                    view.get_serializer(view.get_queryset(), many=True).data
+                ))
+                fast = self._time(repeat, lambda: ORJSONRenderer().render(
+                    view.map_list_rows(list(view.values_queryset(view.get_queryset())))
+                ))
+                self.stdout.write(
+                    f'{name:<13} serializer: {rows / serializer:>9.0f} rows/s  '
+                    f'values: {rows / fast:>9.0f} rows/s  ({serializer / fast:.1f}x)'
+                )
+            transaction.set_rollback(True)
+
+    def _time(self, repeat, func):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def _view(self, viewset, user):
+        request = Request(RequestFactory().get('/'))
+        request.user = user
+        return viewset(request=request, format_kwarg=None, args=(), kwargs={}, action='list')
+
+    def _seed(self, rows):
+        tag = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(username=f'benchmark-{tag}', email=f'{tag}@benchmark.invalid')
+        account = CompanyAccount.objects.create(
+            user=user, bank_name='Bank', account_number='001', branch_code='01', account_holder='Benchmark'
+        )
+        car_category = CarCategory.objects.create(user=user, name=f'Category {tag}', company=f'Company {tag}')
+        car = Car.objects.create(user=user, category=car_category, model='Model', chassis_number=tag, year=2020)
+        expense_category = ExpenseCategory.objects.create(user=user, name='Meals')
+        restaurant = Restaurant.objects.create(user=user, name='Restaurant', location='Tokyo')
+        spare_part = SparePart.objects.create(user=user, name='Shop', address='Osaka')
+        start = date(2024, 1, 1)
+
+        transactions = Transaction.objects.bulk_create(
+            Transaction(
+                user=user, company_account=account, date=start + timedelta(days=i % 365),
+                withdraw=Decimal(i % 1000), deposit=Decimal('0'), balance=Decimal(i), description=f'Payment {i}',
+            )
+            for i in range(rows)
+        )
+        orders = Order.objects.bulk_create(
+            Order(
+                user=user, order_number=f'{tag}-{i}', transaction_type='sale', transaction_catagory='local',
+                transaction_date=start + timedelta(days=i % 365), total_amount=Decimal(i), company_account=account,
+                transaction=transactions[i],
+            )
+            for i in range(rows)
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, car=car, car_category=car_category, vehicle_price=Decimal('1000'))
+            for order in orders for _ in range(2)
+        )
+        Expense.objects.bulk_create(
+            Expense(
+                user=user, title=f'Expense {i}', amount=Decimal(i % 500), date=start + timedelta(days=i % 365),
+                category=expense_category, restaurant=restaurant, spare_part=spare_part, transaction=transactions[i],
+            )
+            for i in range(rows)
+        )
+        return user
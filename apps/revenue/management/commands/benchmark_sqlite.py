@@ -0,0 +1,107 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent SQLite read/write throughput across DB_PROFILE pragma sets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', default=['development', 'production'])
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--rows', type=int, default=50000, help='Rows seeded before the run')
+
+    def handle(self, *args, **options):
+        for profile in options['profiles']:
+            pragmas = settings.SQLITE_PRAGMAS[profile]
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'bench.sqlite3')
+                self._seed(path, pragmas, options['rows'])
+                reads, writes, locked = self._run(path, pragmas, options)
+            seconds = options['seconds']
+            self.stdout.write(
+                f'{profile:<12} reads/s: {reads / seconds:>9.0f}  writes/s: {writes / seconds:>8.0f}  '
+                f'"database is locked": {locked}'
+            )
+
+    def _connect(self, path, pragmas):
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        for name, value in pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _seed(self, path, pragmas, rows):
+        conn = self._connect(path, pragmas)
+        conn.execute(
+            'CREATE TABLE transactions (id INTEGER PRIMARY KEY, user_id INTEGER, company_account_id INTEGER, '
+            'date TEXT, withdraw NUMERIC, deposit NUMERIC, balance NUMERIC, description TEXT)'
+        )
+        conn.execute('CREATE INDEX tx_user_acct_date ON transactions (user_id, company_account_id, date)')
+        conn.execute('BEGIN')
+        conn.executemany(
+            'INSERT INTO transactions (user_id, company_account_id, date, withdraw, deposit, balance, description) '
+            'VALUES (1, ?, ?, ?, 0, 0, ?)',
+            (self._row(i) for i in range(rows)),
+        )
+        conn.execute('COMMIT')
+        conn.close()
+
+    def _row(self, i):
+        return (i % 5, f'2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}', random.randint(100, 100000), f'row {i}')
+
+    def _run(self, path, pragmas, options):
+        deadline = time.monotonic() + options['seconds']
+        counters = {'reads': 0, 'writes': 0, 'locked': 0}
+        lock = threading.Lock()
+
+        def reader():
+            conn = self._connect(path, pragmas)
+            done = 0
+            while time.monotonic() < deadline:
+                conn.execute(
+                    'SELECT SUM(withdraw), COUNT(*) FROM transactions '
+                    'WHERE user_id = 1 AND company_account_id = ? AND date >= ?',
+                    (random.randint(0, 4), '2024-06-01'),
+                ).fetchone()
+                done += 1
+            with lock:
+                counters['reads'] += done
+            conn.close()
+
+        def writer():
+            conn = self._connect(path, pragmas)
+            done = locked = 0
+            while time.monotonic() < deadline:
+                try:
+                    conn.execute('BEGIN IMMEDIATE')
+                    conn.executemany(
+                        'INSERT INTO transactions (user_id, company_account_id, date, withdraw, deposit, balance, '
+                        'description) VALUES (1, ?, ?, ?, 0, 0, ?)',
+                        [self._row(i) for i in range(20)],
+                    )
+                    conn.execute('COMMIT')
+                    done += 1
+                except sqlite3.OperationalError:
+                    locked += 1
+                    if conn.in_transaction:
+                        conn.execute('ROLLBACK')
+            with lock:
+                counters['writes'] += done
+                counters['locked'] += locked
+            conn.close()
+
+        threads = [threading.Thread(target=reader) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=writer) for _ in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counters['reads'], counters['writes'], counters['locked']
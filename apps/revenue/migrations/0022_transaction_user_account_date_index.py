@@ -0,0 +1,17 @@
+# Generated by Django 4.2.21 on 2026-10-19 09:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('revenue', '0021_alter_order_transaction_type'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'company_account', 'date'], name='transactions_user_acct_date'),
+        ),
+    ]
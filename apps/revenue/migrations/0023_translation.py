@@ -0,0 +1,32 @@
+# Generated by Django 4.2.21 on 2026-10-19 09:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('revenue', '0022_transaction_user_account_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Translation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('source_hash', models.CharField(max_length=64)),
+                ('target_lang', models.CharField(max_length=16)),
+                ('source_text', models.TextField()),
+                ('translated_text', models.TextField()),
+            ],
+            options={
+                'db_table': 'translations',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='translation',
+            constraint=models.UniqueConstraint(fields=('source_hash', 'target_lang'), name='translations_source_target_unique'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+from project.fts import create_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('revenue', '0024_hot_query_indexes'),
+    ]
+
+    operations = [
+        create_index('orders', ['order_number', 'customer_name', 'notes']),
+        create_index('customers', ['name', 'email', 'phone']),
+        create_index('salers', ['name', 'email', 'phone']),
+        create_index('car_categories', ['name', 'company', 'description']),
+        create_index('auctions', ['name', 'description']),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.21 on 2026-10-19 09:18
+
+from django.db import migrations, models
+
+
+def analyze(apps, schema_editor):
+    # Refresh planner statistics so amount searches pick the new indexes.
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('ANALYZE transactions')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('revenue', '0025_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'withdraw'], name='transactions_user_withdraw'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'deposit'], name='transactions_user_deposit'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'balance'], name='transactions_user_balance'),
+        ),
+        migrations.RunPython(analyze, migrations.RunPython.noop),
+    ]
@@ -67,6 +67,12 @@ class Order(BaseModel):
     class Meta:
         db_table = 'orders'
         ordering = ['-transaction_date']
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='orders_user_created'),
+            models.Index(fields=['user', 'transaction_date'], name='orders_user_txn_date'),
+            models.Index(fields=['user', 'payment_status'], name='orders_user_payment_status'),
+            models.Index(fields=['user', 'transaction_type', 'transaction_date'], name='orders_user_txn_type_date'),
+        ]
 
     def __str__(self):
         return f"{self.order_number} - {self.transaction_type}"
@@ -232,6 +238,57 @@ class Transaction(BaseModel):
     class Meta:
         db_table = 'transactions'
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['user', 'date', 'id'], name='transactions_user_date_id'),
+            models.Index(fields=['user', 'company_account', 'date', 'id'], name='transactions_user_acct_date_id'),
+            models.Index(fields=['user', 'transaction_id'], name='transactions_user_txn_id'),
+            models.Index(fields=['user', 'withdraw'], name='transactions_user_withdraw'),
+            models.Index(fields=['user', 'deposit'], name='transactions_user_deposit'),
+            models.Index(fields=['user', 'balance'], name='transactions_user_balance'),
+        ]
 
     def __str__(self):
         return f"{self.date} - {self.description}"
+
+
+class Translation(BaseModel):
+    source_hash = models.CharField(max_length=64)
+    target_lang = models.CharField(max_length=16)
+    source_text = models.TextField()
+    translated_text = models.TextField()
+
+    class Meta:
+        db_table = 'translations'
+        constraints = [
+            models.UniqueConstraint(fields=['source_hash', 'target_lang'], name='translations_source_target_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.target_lang}: {self.source_text[:50]}"
+
+
+class Change(models.Model):
+    """Append-only per-user change feed behind ``GET /api/changes/``; see ``apps.revenue.changes``."""
+    UPSERT = 'u'
+    DELETE = 'd'
+    OPS = [
+        (UPSERT, 'Upsert'),
+        (DELETE, 'Delete'),
+    ]
+    # AUTOINCREMENT on SQLite: seq values are never reused.
+    seq = models.BigAutoField(primary_key=True)
+    # No FK constraint: deleting a user cascades into rows whose post_delete
+    # signals still append changes for that user.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_constraint=False, related_name='changes')
+    table = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    op = models.CharField(max_length=1, choices=OPS)
+
+    class Meta:
+        db_table = 'changes'
+        indexes = [
+            models.Index(fields=['user', 'seq'], name='changes_user_seq'),
+        ]
+
+    def __str__(self):
+        return f"{self.seq}: {self.op} {self.table}#{self.object_id}"
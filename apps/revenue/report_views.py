@@ -0,0 +1,267 @@
+"""Async dashboard, reports and financial report endpoints (project.async_views).
+
+Each endpoint keeps the URL and payload of the ``OrderViewSet`` action it
+replaces. Data is gathered with the async ORM, the independent queries of a
+payload awaited together with ``asyncio.gather``, and the result is cached
+under the user's order and expense generations like before. The xlsx of the
+financial report is built in a worker thread so the event loop isn't blocked
+by openpyxl.
+"""
+import asyncio
+from datetime import datetime
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q, Sum
+from django.http import HttpResponse
+from openpyxl import Workbook
+from openpyxl.styles import Font
+from rest_framework import exceptions
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+
+from apps.expense.models import Expense
+from apps.revenue.models import Order
+from project import generations
+from project.admission import admit
+from project.async_views import AsyncAPIView, json_response
+from project.timing import measure
+
+REPORT_ROW_FIELDS = ('transaction_type', 'transaction_date', 'payment_status', 'total_amount')
+
+
+def report_range(params):
+    """``(start, end)`` from ``start_date``/``end_date`` or ``period`` (today, month, year)."""
+    period = params.get('period', 'month')
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    today = datetime.now().date()
+
+    if start_date and end_date:
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.strptime(end_date, '%Y-%m-%d').date()
+    elif period == 'today':
+        start = end = today
+    elif period == 'year':
+        start = today.replace(month=1, day=1)
+        end = today
+    else:
+        start = today.replace(day=1)
+        end = today
+    return start, end
+
+
+def report_page_size(params, default=10):
+    """``pageSize`` from ``params``; a malformed value falls back to ``default`` as in project.pagination."""
+    try:
+        return max(1, int(params.get('pageSize', default)))
+    except ValueError:
+        return default
+
+
+def invalid_range():
+    return json_response({'detail': 'start_date and end_date must be dates in YYYY-MM-DD format.'}, status=400)
+
+
+async def _rows(queryset):
+    return [row async for row in queryset]
+
+
+async def dashboard_data(user):
+    orders = Order.objects.filter(user=user)
+    totals, expenses, latest_orders = await asyncio.gather(
+        orders.aaggregate(
+            approved=Sum('total_amount', filter=Q(payment_status='completed')),
+            pending=Sum('total_amount', filter=Q(payment_status='pending')),
+            purchase=Sum('total_amount', filter=Q(transaction_type='purchase')),
+        ),
+        Expense.objects.filter(user=user).aaggregate(total=Sum('amount')),
+        _rows(orders.order_by('-transaction_date')[:10].values(*REPORT_ROW_FIELDS)),
+    )
+    return {
+        'approved_amount': float(totals['approved'] or 0),
+        'pending_amount': float(totals['pending'] or 0),
+        'total_expense': float(expenses['total'] or 0),
+        'total_purchase': float(totals['purchase'] or 0),
+        'latest_orders': latest_orders,
+    }
+
+
+async def cached_dashboard_data(user):
+    return await generations.acached('dashboard', user.id, [Order, Expense], lambda: dashboard_data(user))
+
+
+async def report_rows(user, report_type, period, start, end, payment_status, search):
+    queries = []
+
+    if report_type in ['all', 'expenses']:
+        expenses = Expense.objects.filter(user=user)
+        if period != 'all':
+            expenses = expenses.filter(date__range=[start, end])
+        if search:
+            expenses = expenses.filter(Q(description__icontains=search))
+        queries.append(_rows(expenses.values('date', 'amount')))
+
+    if report_type in ['all', 'orders', 'sales', 'purchases', 'auctions']:
+        orders = Order.objects.filter(user=user)
+        if period != 'all':
+            orders = orders.filter(transaction_date__range=[start, end])
+        if report_type == 'sales':
+            orders = orders.filter(transaction_type='sale')
+        elif report_type == 'purchases':
+            orders = orders.filter(transaction_type='purchase')
+        elif report_type == 'auctions':
+            orders = orders.filter(transaction_type='auction')
+        if payment_status:
+            orders = orders.filter(payment_status=payment_status)
+        if search:
+            orders = orders.filter(Q(order_number__icontains=search) | Q(customer_name__icontains=search))
+        queries.append(_rows(orders.values(*REPORT_ROW_FIELDS)))
+
+    results = await asyncio.gather(*queries)
+    data = []
+    if report_type in ['all', 'expenses']:
+        data.extend({
+            'transaction_type': 'expense',
+            'transaction_date': expense['date'],
+            'payment_status': 'completed',
+            'total_amount': expense['amount'],
+        } for expense in results.pop(0))
+    if results:
+        data.extend(results.pop(0))
+    data.sort(key=lambda x: x['transaction_date'], reverse=True)
+    return data
+
+
+async def financial_report_data(user, start, end):
+    orders = Order.objects.filter(user=user, transaction_date__range=[start, end])
+    expenses = Expense.objects.filter(user=user, date__range=[start, end])
+    totals, expense_total, order_rows, expense_rows = await asyncio.gather(
+        orders.aaggregate(
+            sales=Sum('total_amount', filter=Q(transaction_type='sale')),
+            purchases=Sum('total_amount', filter=Q(transaction_type='purchase')),
+            auctions=Sum('total_amount', filter=Q(transaction_type='auction')),
+        ),
+        expenses.aaggregate(total=Sum('amount')),
+        _rows(orders.values_list('transaction_type', 'transaction_date', 'payment_status', 'total_amount')),
+        _rows(expenses.values_list('date', 'amount')),
+    )
+    return {
+        'sales': totals['sales'] or 0,
+        'purchases': totals['purchases'] or 0,
+        'auctions': totals['auctions'] or 0,
+        'expenses': expense_total['total'] or 0,
+        'orders': order_rows,
+        'expense_rows': expense_rows,
+    }
+
+
+def financial_report_workbook(start, end, data):
+    sales, purchases, auctions, total_expenses = data['sales'], data['purchases'], data['auctions'], data['expenses']
+    revenue = sales + auctions
+    cost = purchases + total_expenses
+    profit = revenue - cost
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Financial Report'
+
+    ws['A1'] = 'Financial Report'
+    ws['A1'].font = Font(size=16, bold=True)
+    ws['A2'] = f'Period: {start} to {end}'
+
+    ws['A4'] = 'Summary'
+    ws['A4'].font = Font(bold=True)
+    ws['A5'] = 'Currency'
+    ws['B5'] = '¥'
+    ws['A6'] = 'Total Revenue (Sales + Auctions)'
+    ws['B6'] = f'¥ {float(revenue)}'
+    ws['A7'] = 'Total Cost (Purchases + Expenses)'
+    ws['B7'] = f'¥ {float(cost)}'
+    ws['A8'] = 'Net Profit'
+    ws['B8'] = f'¥ {float(profit)}'
+    ws['B9'].font = Font(bold=True)
+
+    ws['A10'] = 'Breakdown'
+    ws['A10'].font = Font(bold=True)
+    ws['A11'] = 'Sales'
+    ws['B11'] = f'¥ {float(sales)}'
+    ws['A12'] = 'Auctions'
+    ws['B12'] = f'¥ {float(auctions)}'
+    ws['A13'] = 'Purchases'
+    ws['B13'] = f'¥ {float(purchases)}'
+    ws['A14'] = 'Expenses'
+    ws['B14'] = f'¥ {float(total_expenses)}'
+
+    ws['A16'] = 'Transactions Detail'
+    ws['A16'].font = Font(bold=True)
+    ws.append(['Type', 'Date', 'Payment Status', 'Amount'])
+
+    for transaction_type, transaction_date, payment_status, total_amount in data['orders']:
+        ws.append([transaction_type.capitalize(), transaction_date.strftime('%Y-%m-%d'),
+                   payment_status, f'¥ {float(total_amount)}'])
+
+    for expense_date, amount in data['expense_rows']:
+        ws.append(['Expense', expense_date.strftime('%Y-%m-%d'), 'completed', f'¥ {float(amount)}'])
+
+    output = BytesIO()
+    with measure('render'):
+        wb.save(output)
+    return output.getvalue()
+
+
+class DashboardView(AsyncAPIView):
+
+    async def get(self, request):
+        return json_response(await cached_dashboard_data(request.user))
+
+
+class ReportsView(AsyncAPIView):
+
+    async def get(self, request):
+        params = request.GET
+        report_type = params.get('type', 'orders')
+        period = params.get('period', 'month')
+        payment_status = params.get('payment_status')
+        search = params.get('search')
+        try:
+            start, end = report_range(params)
+        except ValueError:
+            return invalid_range()
+
+        data = await generations.acached(
+            'reports', request.user.id, [Order, Expense],
+            lambda: report_rows(request.user, report_type, period, start, end, payment_status, search),
+            params=[report_type, period, start, end, payment_status, search],
+        )
+
+        paginator = PageNumberPagination()
+        paginator.page_size = report_page_size(params)
+        try:
+            page = paginator.paginate_queryset(data, Request(request))
+        except exceptions.NotFound as e:
+            return json_response({'detail': str(e.detail)}, status=404)
+        return json_response(paginator.get_paginated_response(page).data)
+
+
+class FinancialReportView(AsyncAPIView):
+    throttle_scope = 'report'
+
+    @admit('financial_report')
+    async def get(self, request):
+        try:
+            start, end = report_range(request.GET)
+        except ValueError:
+            return invalid_range()
+        user = request.user
+
+        async def build():
+            data = await financial_report_data(user, start, end)
+            return await sync_to_async(financial_report_workbook, thread_sensitive=False)(start, end, data)
+
+        content = await generations.acached(
+            'financial_report', user.id, [Order, Expense], build, params=[start, end],
+        )
+        response = HttpResponse(content, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        response['Content-Disposition'] = f'attachment; filename="Report {start}_{end}.xlsx"'
+        return response
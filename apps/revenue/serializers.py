@@ -1,13 +1,15 @@
 from rest_framework import serializers
 from apps.revenue.models import Car, CarCategory, Order, OrderItem, Customer, Saler, CompanyAccount, Auction, Transaction
+from project.sparse import SparseFieldsetMixin
+from project.timing import TimedSerializerMixin
 
-class CarCategorySerializer(serializers.ModelSerializer):
+class CarCategorySerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = CarCategory
         fields = ['id', 'name', 'company', 'description', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
-class CarSerializer(serializers.ModelSerializer):
+class CarSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     company_name = serializers.CharField(source='category.company', read_only=True)
     
@@ -16,7 +18,7 @@ class CarSerializer(serializers.ModelSerializer):
         fields = ['id', 'category', 'category_name', 'company_name', 'description', 'model', 'chassis_number', 'year', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     car_name = serializers.CharField(source='car.category.name', read_only=True)
     model = serializers.CharField(source='car.model', read_only=True)
     chassis_number = serializers.CharField(source='car.chassis_number', read_only=True)
@@ -57,13 +59,14 @@ class OrderItemCreateSerializer(serializers.Serializer):
     registration_fee_tax = serializers.DecimalField(max_digits=10, decimal_places=2, default=0, required=False)
     canceling_fee = serializers.DecimalField(max_digits=10, decimal_places=2, default=0, required=False)
     
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     auction_name = serializers.CharField(source='auction.name', read_only=True)
     customer_name_obj = serializers.CharField(source='customer.name', read_only=True)
     saler_name_obj = serializers.CharField(source='saler.name', read_only=True)
     company_account_name = serializers.CharField(source='company_account.bank_name', read_only=True)
     transaction = serializers.SerializerMethodField()
+    expandable_fields = ('items', 'transaction')
     
     class Meta:
         model = Order
@@ -107,31 +110,31 @@ class CreateOrderSerializer(serializers.Serializer):
     items = OrderItemCreateSerializer(many=True)
 
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Customer
         fields = ['id', 'name', 'email', 'address', 'phone', 'account_number', 'branch_code', 'bank_name', 'swift_code', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
-class SalerSerializer(serializers.ModelSerializer):
+class SalerSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Saler
         fields = ['id', 'name', 'email', 'address', 'phone', 'account_number', 'branch_code', 'bank_name', 'swift_code', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
-class CompanyAccountSerializer(serializers.ModelSerializer):
+class CompanyAccountSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = CompanyAccount
         fields = ['id', 'bank_name', 'account_number', 'branch_code', 'account_holder', 'swift_code', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
-class AuctionSerializer(serializers.ModelSerializer):
+class AuctionSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Auction
         fields = ['id', 'name', 'description', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
-class TransactionSerializer(serializers.ModelSerializer):
+class TransactionSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     company_account_name = serializers.CharField(source='company_account.bank_name', read_only=True)
     
     class Meta:
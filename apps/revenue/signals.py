@@ -0,0 +1,18 @@
+from apps.revenue import changes
+from apps.revenue.models import Auction, Car, CarCategory, CompanyAccount, Customer, Order, OrderItem, Saler, Transaction
+from project import generations, pubsub
+
+
+def order_owner(item):
+    if OrderItem.order.is_cached(item):
+        return item.order.user_id
+    if not hasattr(item, '_order_owner'):
+        item._order_owner = Order.objects.filter(pk=item.order_id).values_list('user_id', flat=True).first()
+    return item._order_owner
+
+
+generations.track(Order, Transaction, Car, CarCategory, Customer, Saler, CompanyAccount, Auction)
+generations.track(OrderItem, owner=order_owner)
+changes.track(Order, Transaction, Car, CarCategory, Customer, Saler, CompanyAccount, Auction)
+changes.track(OrderItem, owner=order_owner)
+pubsub.track('dashboard', Order)
@@ -0,0 +1,928 @@
+import asyncio
+import base64
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from apps.account.models import User
+from apps.revenue import translate_client, translation
+from apps.revenue.live_views import dashboard_delta
+from apps.revenue.filters import parse_amount_term, transaction_search_q
+from apps.revenue.models import Auction, Car, CarCategory, CompanyAccount, Customer, Order, OrderItem, Transaction, Translation
+from apps.revenue.serializers import CustomerSerializer, OrderSerializer, TransactionSerializer
+from apps.revenue.views import OrderViewSet, TransactionViewSet
+from project import generations, timing
+from project.pagination import CachedCountPagination
+from project.renderers import ORJSONRenderer
+from project.testing import OwnerTestCase
+from project.write_lock import serialized_writes
+
+
+class FakeTranslateServer:
+    """Local stand-in for the upstream translate_a/t endpoint."""
+
+    def __init__(self):
+        self.requests = []
+        self.status = 200
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = parse_qs(urlparse(self.path).query)
+                server.requests.append(params['q'])
+                if server.status != 200:
+                    self.send_response(server.status)
+                    self.end_headers()
+                    return
+                body = json.dumps([[f"[{params['tl'][0]}] {q}", 'en'] for q in params['q']]).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}/translate_a/t'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class TranslationTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.upstream = FakeTranslateServer()
+        cls.settings_override = override_settings(
+            TRANSLATOR_CLASS='apps.revenue.translation.StubTranslator',
+            TRANSLATION_UPSTREAM_URL=cls.upstream.url,
+            TRANSLATION_CHUNK_SIZE=2,
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.upstream.close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.upstream.requests.clear()
+        self.upstream.status = 200
+        translate_client.breaker.reset()
+        translation.reset_translator()
+        translation.memory_cache.clear()
+        self.client = APIClient()
+
+    def post_batch(self, texts, target_lang='ja'):
+        return self.client.post(
+            '/api/revenue/translate-batch/', {'texts': texts, 'target_lang': target_lang}, format='json'
+        )
+
+
+class TranslationCacheTests(TranslationTestCase):
+    def test_batch_sends_each_distinct_miss_upstream_once(self):
+        response = self.post_batch(['Prius', 'Aqua', 'Prius'])
+        self.assertEqual(response.json()['texts'], ['[ja] Prius', '[ja] Aqua', '[ja] Prius'])
+        self.assertEqual(self.upstream.requests, [['Prius', 'Aqua']])
+        self.assertEqual(Translation.objects.count(), 2)
+
+    def test_repeat_batch_is_answered_from_the_store(self):
+        self.post_batch(['Prius', 'Aqua'])
+        translation.memory_cache.clear()
+        with self.assertNumQueries(1):
+            self.post_batch(['Prius', 'Aqua'])
+
+        with self.assertNumQueries(0):
+            response = self.post_batch(['Aqua', 'Prius'])
+        self.assertEqual(response.json()['texts'], ['[ja] Aqua', '[ja] Prius'])
+        self.assertEqual(len(self.upstream.requests), 1)
+
+    def test_malformed_batches_are_rejected(self):
+        for body in ([['Prius']], {'texts': 'Prius'}, {'texts': ['Prius', 1]}, {'texts': ['Prius'], 'target_lang': 1}):
+            response = self.client.post('/api/revenue/translate-batch/', body, format='json')
+            self.assertEqual(response.status_code, 400, body)
+        self.assertEqual(self.upstream.requests, [])
+
+    def test_single_text_uses_the_configured_translator(self):
+        response = self.client.post('/api/revenue/translate/', {'text': 'Prius', 'target_lang': 'ja'}, format='json')
+        self.assertEqual(response.data['text'], '[ja] Prius')
+        self.assertEqual(translation.get_translator().calls, [(['Prius'], 'ja')])
+
+
+class TranslateBatchUpstreamTests(TranslationTestCase):
+    def test_misses_are_fanned_out_in_chunks(self):
+        response = self.post_batch(['a', 'b', 'c', 'd', 'e'])
+        self.assertEqual(response.json()['texts'], ['[ja] a', '[ja] b', '[ja] c', '[ja] d', '[ja] e'])
+        self.assertEqual(sorted(self.upstream.requests), [['a', 'b'], ['c', 'd'], ['e']])
+
+    def test_one_client_serves_every_event_loop(self):
+        self.assertEqual(asyncio.run(translate_client.translate_many(['a'], 'ja')), ['[ja] a'])
+        client = translate_client._upstream['client']
+        self.assertEqual(asyncio.run(translate_client.translate_many(['b'], 'ja')), ['[ja] b'])
+        self.assertIs(translate_client._upstream['client'], client)
+
+    @override_settings(TRANSLATION_CHUNK_SIZE=20)
+    def test_breaker_fails_fast_while_upstream_is_down(self):
+        self.upstream.status = 500
+        for _ in range(translate_client.breaker.threshold):
+            self.assertEqual(self.post_batch(['Prius']).status_code, 500)
+
+        response = self.post_batch(['Prius'])
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.upstream.requests), translate_client.breaker.threshold)
+
+
+class SerializedWritesTests(TestCase):
+    def test_writers_run_one_at_a_time(self):
+        active = []
+        overlaps = []
+
+        def write():
+            with serialized_writes():
+                active.append(1)
+                overlaps.append(len(active))
+                time.sleep(0.01)
+                with serialized_writes():  # nested use does not deadlock
+                    pass
+                active.pop()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            lock_path = os.path.join(tmp, 'writelock')
+            with override_settings(SQLITE_WRITE_LOCK=True, SQLITE_WRITE_LOCK_PATH=lock_path):
+                threads = [threading.Thread(target=write) for _ in range(5)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+        self.assertEqual(overlaps, [1] * 5)
+
+
+class QueryPlanTests(OwnerTestCase):
+    """Hot per-user queries must be answered from a composite index, not a table scan."""
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertRegex(plan, rf'USING (COVERING )?INDEX {index_name}\b', plan)
+
+    def view_queryset(self, viewset_class, **params):
+        view = viewset_class()
+        view.request = SimpleNamespace(user=self.user, query_params=params)
+        return view.get_queryset()
+
+    def test_order_list(self):
+        self.assertUsesIndex(self.view_queryset(OrderViewSet)[:10], 'orders_user_created')
+
+    def test_order_date_range(self):
+        queryset = Order.objects.filter(user=self.user, transaction_date__range=['2024-01-01', '2024-01-31'])
+        self.assertUsesIndex(queryset, 'orders_user_txn_date')
+
+    def test_order_payment_status_total(self):
+        queryset = Order.objects.filter(user=self.user, payment_status='completed').values('user').annotate(
+            total=Sum('total_amount')
+        )
+        self.assertUsesIndex(queryset, 'orders_user_payment_status')
+
+    def test_order_transaction_type(self):
+        queryset = Order.objects.filter(user=self.user, transaction_type='purchase')
+        self.assertUsesIndex(queryset, 'orders_user_txn_type_date')
+
+    def test_transaction_list(self):
+        self.assertUsesIndex(self.view_queryset(TransactionViewSet)[:10], 'transactions_user_date_id')
+
+    def test_transaction_account_balance_lookup(self):
+        queryset = Transaction.objects.filter(
+            user=self.user, company_account_id=1, date__lte='2024-01-31'
+        ).order_by('-date', '-id')[:1]
+        self.assertUsesIndex(queryset, 'transactions_user_acct_date_id')
+
+    def test_transaction_id_lookup(self):
+        queryset = Transaction.objects.filter(user=self.user, transaction_id='V495093').order_by('id')[:1]
+        self.assertUsesIndex(queryset, 'transactions_user_txn_id')
+
+
+class FullTextSearchTests(OwnerTestCase):
+    def customer(self, name, email='buyer@example.com'):
+        return Customer.objects.create(
+            user=self.user, name=name, email=email, address='', phone='', account_number='', branch_code='',
+            bank_name=''
+        )
+
+    def search(self, term):
+        response = self.client.get('/api/revenue/customers/', {'search': term})
+        return [row['name'] for row in response.data['results']]
+
+    def test_japanese_substring_match(self):
+        self.customer('株式会社トヨタ自動車')
+        self.customer('日産販売')
+        self.assertEqual(self.search('トヨタ自'), ['株式会社トヨタ自動車'])
+
+    def test_index_follows_updates_and_deletes(self):
+        customer = self.customer('Osaka Motors')
+        customer.name = 'Kobe Motors'
+        customer.save()
+        self.assertEqual(self.search('osaka'), [])
+        self.assertEqual(self.search('kobe'), ['Kobe Motors'])
+
+        customer.delete()
+        self.assertEqual(self.search('kobe'), [])
+
+    def test_results_are_ranked(self):
+        self.customer('Other', email='motors@example.com')
+        self.customer('Motors Motors Motors', email='motors@example.com')
+        self.assertEqual(self.search('motors'), ['Motors Motors Motors', 'Other'])
+
+    def test_short_terms_fall_back_to_icontains(self):
+        self.customer('AB Trading')
+        self.assertEqual(self.search('ab'), ['AB Trading'])
+
+
+class TransactionAmountSearchTests(OwnerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        account = CompanyAccount.objects.create(
+            user=cls.user, bank_name='Bank', account_number='001', branch_code='01', account_holder='Owner'
+        )
+        for withdraw, description in [(12000, 'Tolls'), (12500, 'Fuel'), (120, 'Parking')]:
+            Transaction.objects.create(
+                user=cls.user, company_account=account, date=date(2024, 1, 1), withdraw=Decimal(withdraw),
+                balance=Decimal('0'), description=description
+            )
+
+    def search(self, term):
+        response = self.client.get('/api/revenue/transactions/', {'search': term})
+        return sorted(row['description'] for row in response.data['results'])
+
+    def test_parse_amount_term(self):
+        self.assertEqual(parse_amount_term('12,000'), (Decimal('12000'), Decimal('12000')))
+        self.assertEqual(parse_amount_term('¥12000'), (Decimal('12000'), Decimal('12000')))
+        self.assertEqual(parse_amount_term('13000-12000'), (Decimal('12000'), Decimal('13000')))
+        self.assertIsNone(parse_amount_term('2024-01-01'))
+        self.assertIsNone(parse_amount_term('V495093'))
+
+    def test_amount_terms_match_exactly_or_by_range(self):
+        self.assertEqual(self.search('¥12,000'), ['Tolls'])
+        self.assertEqual(self.search('12000-13000'), ['Fuel', 'Tolls'])
+        self.assertEqual(self.search('120'), ['Parking'])
+
+    def test_text_terms_search_descriptions(self):
+        self.assertEqual(self.search('fue'), ['Fuel'])
+
+    def test_numeric_terms_also_match_transaction_ids(self):
+        fuel = Transaction.objects.get(description='Fuel')
+        fuel.transaction_id = '120'
+        with self.captureOnCommitCallbacks(execute=True):
+            fuel.save()
+        self.assertEqual(self.search('120'), ['Fuel', 'Parking'])
+        self.assertEqual(self.search('12'), [])
+
+    def test_amount_search_uses_the_amount_indexes(self):
+        account = CompanyAccount.objects.get(user=self.user)
+        Transaction.objects.bulk_create(
+            Transaction(
+                user=self.user, company_account=account, date=date(2024, 1, i % 28 + 1), withdraw=Decimal(i),
+                deposit=Decimal(i * 7), balance=Decimal(i * 13), description='', transaction_id=f'V{i}'
+            )
+            for i in range(500)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE transactions')
+
+        queryset = Transaction.objects.filter(user=self.user).filter(
+            transaction_search_q('12000', self.user)
+        ).order_by('-date', '-id')
+        plan = queryset.explain()
+        for index_name in ('transactions_user_withdraw', 'transactions_user_deposit', 'transactions_user_balance',
+                           'transactions_user_txn_id'):
+            self.assertIn(index_name, plan)
+
+
+class KeysetPaginationTests(OwnerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        account = CompanyAccount.objects.create(
+            user=cls.user, bank_name='Bank', account_number='001', branch_code='01', account_holder='Owner'
+        )
+        # Three rows per day so pages have to break ties on id.
+        Transaction.objects.bulk_create(
+            Transaction(
+                user=cls.user, company_account=account, date=date(2024, 1, i // 3 + 1), withdraw=Decimal(i),
+                balance=Decimal('0'), description=f'Row {i}'
+            )
+            for i in range(25)
+        )
+
+    def test_cursor_pages_cover_the_ordering_without_gaps(self):
+        expected = list(Transaction.objects.filter(user=self.user).order_by('-date', '-id').values_list('id', flat=True))
+        seen = []
+        url, params = '/api/revenue/transactions/', {'pagination': 'cursor'}
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url, params)
+            seen += [row['id'] for row in response.data['results']]
+            url, params = response.data['next'], None
+        self.assertEqual(seen, expected)
+
+    def test_count_is_opt_in(self):
+        response = self.client.get('/api/revenue/transactions/', {'pagination': 'cursor'})
+        self.assertNotIn('count', response.data)
+        response = self.client.get('/api/revenue/transactions/', {'pagination': 'cursor', 'count': 'true'})
+        self.assertEqual(response.data['count'], 25)
+
+    def test_malformed_cursors_are_not_found(self):
+        def encode(value):
+            return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+        for cursor in ('!!!', encode({'date': '2024-01-01'}), encode(['2024-01-01']),
+                       encode(['not-a-date', 1]), encode(['2024-01-01', 'x']), encode([None, 1])):
+            response = self.client.get('/api/revenue/transactions/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, cursor)
+        # Values are converted by the ordering fields, so a string id still compares as a number.
+        row = Transaction.objects.get(description='Row 4')
+        response = self.client.get('/api/revenue/transactions/', {'cursor': encode(['2024-01-02', str(row.id)])})
+        self.assertEqual([row['description'] for row in response.data['results']], ['Row 3', 'Row 2', 'Row 1', 'Row 0'])
+
+    def test_page_numbers_remain_the_default(self):
+        response = self.client.get('/api/revenue/transactions/', {'page': 2})
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 10)
+
+
+class CachedCountTests(OwnerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i in range(25):
+            Customer.objects.create(user=cls.user, name=f'Customer {i}')
+
+    def test_later_pages_reuse_the_count(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/revenue/customers/', {'page': 1})
+        self.assertEqual(response.data['count'], 25)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/revenue/customers/', {'page': 2})
+        self.assertEqual(response.data['count'], 25)
+
+    def test_write_refreshes_the_count(self):
+        self.client.get('/api/revenue/customers/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Customer.objects.create(user=self.user, name='Newcomer')
+        self.assertEqual(self.client.get('/api/revenue/customers/').data['count'], 26)
+
+    def test_filters_are_counted_separately(self):
+        self.client.get('/api/revenue/customers/')
+        response = self.client.get('/api/revenue/customers/', {'search': 'Customer 1'})
+        self.assertEqual(response.data['count'], 11)
+
+    def test_search_count_is_bounded(self):
+        original = CachedCountPagination.count_limit
+        CachedCountPagination.count_limit = 20
+        try:
+            response = self.client.get('/api/revenue/customers/', {'search': 'Customer'})
+        finally:
+            CachedCountPagination.count_limit = original
+        self.assertEqual(response.data['count'], 20)
+        self.assertFalse(response.data['count_exact'])
+        self.assertEqual(self.client.get('/api/revenue/customers/').data['count'], 25)
+
+    def test_pages_continue_past_a_bounded_count(self):
+        with mock.patch.object(CachedCountPagination, 'count_limit', 20):
+            second = self.client.get('/api/revenue/customers/', {'search': 'Customer', 'page': 2})
+            third = self.client.get('/api/revenue/customers/', {'search': 'Customer', 'page': 3})
+            fourth = self.client.get('/api/revenue/customers/', {'search': 'Customer', 'page': 4})
+        self.assertIsNotNone(second.data['next'])
+        self.assertEqual(third.status_code, 200)
+        self.assertEqual((len(third.data['results']), third.data['next']), (5, None))
+        self.assertEqual(third.data['count'], 25)
+        self.assertEqual(fourth.status_code, 404)
+
+
+class GenerationCacheTests(OwnerTestCase):
+    token_auth = True
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other = User.objects.create_user(username='other', email='other@example.com', password='secret')
+
+    def create_order(self, user, number, amount):
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.create(
+                user=user, order_number=number, transaction_type='sale', transaction_catagory='local',
+                transaction_date=date(2024, 1, 1), total_amount=Decimal(amount), payment_status='completed',
+            )
+
+    def test_dashboard_is_served_from_cache(self):
+        self.create_order(self.user, 'A-1', '100')
+        self.assertEqual(self.client.get('/api/revenue/orders/dashboard/').json()['approved_amount'], 100)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/revenue/orders/dashboard/').json()['approved_amount'], 100)
+
+    def test_owner_writes_refresh_the_dashboard(self):
+        self.client.get('/api/revenue/orders/dashboard/')
+        self.create_order(self.user, 'A-1', '100')
+        self.assertEqual(self.client.get('/api/revenue/orders/dashboard/').json()['approved_amount'], 100)
+
+    def test_other_users_writes_keep_the_cache(self):
+        self.client.get('/api/revenue/orders/dashboard/')
+        self.create_order(self.other, 'B-1', '100')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/revenue/orders/dashboard/').json()['approved_amount'], 0)
+
+
+class ReportViewTests(OwnerTestCase):
+    token_auth = True
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for number, kind, status_, amount in (('R-1', 'sale', 'completed', '300'), ('R-2', 'purchase', 'pending', '100')):
+            Order.objects.create(
+                user=cls.user, order_number=number, transaction_type=kind, transaction_catagory='local',
+                transaction_date=date(2024, 1, int(number[-1])), total_amount=Decimal(amount), payment_status=status_,
+            )
+
+    def test_dashboard_totals(self):
+        data = self.client.get('/api/revenue/orders/dashboard/').json()
+        self.assertEqual(
+            [data['approved_amount'], data['pending_amount'], data['total_purchase'], data['total_expense']],
+            [300, 100, 100, 0],
+        )
+        self.assertEqual([order['transaction_type'] for order in data['latest_orders']], ['purchase', 'sale'])
+
+    def test_reports_are_paginated_newest_first(self):
+        response = self.client.get('/api/revenue/orders/reports/', {'type': 'all', 'period': 'all', 'pageSize': 1})
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual(response.json()['results'][0]['transaction_type'], 'purchase')
+        self.assertEqual(self.client.get('/api/revenue/orders/reports/', {'page': 9}).status_code, 404)
+
+    def test_malformed_report_params(self):
+        for page_size in ('ten', '0'):
+            response = self.client.get('/api/revenue/orders/reports/', {'period': 'all', 'pageSize': page_size})
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual(self.client.get('/api/revenue/orders/reports/', {'page': 'x'}).status_code, 404)
+        dates = {'start_date': '2024-13-01', 'end_date': 'soon'}
+        self.assertEqual(self.client.get('/api/revenue/orders/reports/', dates).status_code, 400)
+        self.assertEqual(self.client.get('/api/revenue/orders/financial_report/', dates).status_code, 400)
+
+    def test_financial_report_is_a_workbook(self):
+        response = self.client.get(
+            '/api/revenue/orders/financial_report/', {'start_date': '2024-01-01', 'end_date': '2024-01-31'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="Report 2024-01-01_2024-01-31.xlsx"')
+        self.assertEqual(response.content[:2], b'PK')
+
+    def test_credentials_are_required(self):
+        response = APIClient().get('/api/revenue/orders/dashboard/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+
+
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    async def test_concurrent_misses_build_once(self):
+        builds = []
+
+        async def build():
+            builds.append(1)
+            await asyncio.sleep(0.05)
+            return {'total': len(builds)}
+
+        results = await asyncio.gather(*(
+            generations.acached('report', 1, [Order], build, params=['2024-01']) for _ in range(5)
+        ))
+        self.assertEqual(results, [{'total': 1}] * 5)
+        self.assertEqual(await generations.acached('report', 1, [Order], build, params=['2024-01']), {'total': 1})
+        self.assertEqual(len(builds), 1)
+
+    async def test_a_failed_build_is_shared_and_not_cached(self):
+        attempts = []
+
+        async def build():
+            attempts.append(1)
+            await asyncio.sleep(0.05)
+            raise ValueError('boom')
+
+        results = await asyncio.gather(
+            *(generations.acached('report', 1, [Order], build) for _ in range(3)), return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(len(attempts), 1)
+        with self.assertRaises(ValueError):
+            await generations.acached('report', 1, [Order], build)
+        self.assertEqual(len(attempts), 2)
+
+
+class GenerationBumpTests(OwnerTestCase):
+    def test_bumps_are_coalesced_per_transaction(self):
+        previous = generations.get(Customer, self.user.id)
+        with mock.patch.object(generations, '_token', wraps=generations._token) as token:
+            with self.captureOnCommitCallbacks(execute=True):
+                for n in range(3):
+                    Customer.objects.create(user=self.user, name=f'Customer {n}')
+        self.assertEqual(token.call_count, 1)
+        self.assertNotEqual(generations.get(Customer, self.user.id), previous)
+
+    def test_rolled_back_bumps_do_not_swallow_later_ones(self):
+        previous = generations.get(Customer, self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                Customer.objects.create(user=self.user, name='Rolled back')
+                raise RuntimeError
+        self.assertEqual(generations.get(Customer, self.user.id), previous)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Customer.objects.create(user=self.user, name='Committed')
+        self.assertNotEqual(generations.get(Customer, self.user.id), previous)
+
+
+class ConditionalGetTests(OwnerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.customer = Customer.objects.create(user=cls.user, name='Customer')
+
+    def test_unchanged_list_is_not_modified(self):
+        etag = self.client.get('/api/revenue/customers/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/revenue/customers/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_write_changes_the_etag(self):
+        etag = self.client.get(f'/api/revenue/customers/{self.customer.pk}/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/revenue/customers/{self.customer.pk}/', {'name': 'Renamed'}, format='json')
+        response = self.client.get(f'/api/revenue/customers/{self.customer.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['name'], 'Renamed')
+
+    def test_nested_tables_are_part_of_the_etag(self):
+        etag = self.client.get('/api/revenue/transactions/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            CompanyAccount.objects.create(
+                user=self.user, bank_name='Bank', account_number='001', branch_code='01', account_holder='Owner'
+            )
+        response = self.client.get('/api/revenue/transactions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_query_string_is_part_of_the_etag(self):
+        etag = self.client.get('/api/revenue/customers/')['ETag']
+        response = self.client.get('/api/revenue/customers/', {'page': 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class BootstrapTests(OwnerTestCase):
+    token_auth = True
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other = User.objects.create_user(username='other', email='other@example.com', password='secret')
+        Customer.objects.create(user=cls.user, name='Mine')
+        Customer.objects.create(user=cls.other, name='Theirs')
+
+    def test_bundle_matches_the_resource_endpoints(self):
+        # The token lookup, then one query per reference list.
+        with self.assertNumQueries(9):
+            bundle = self.client.get('/api/bootstrap/').json()
+        customers = self.client.get('/api/revenue/customers/').json()['results']
+        self.assertEqual(bundle['customers'], customers)
+        self.assertEqual(bundle['spare_parts'], [])
+
+    def test_warm_bundle_and_revalidation_skip_the_database(self):
+        etag = self.client.get('/api/bootstrap/')['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/bootstrap/').status_code, 200)
+            self.assertEqual(self.client.get('/api/bootstrap/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_reference_writes_refresh_the_bundle(self):
+        self.client.get('/api/bootstrap/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Auction.objects.create(user=self.user, name='USS')
+        self.assertEqual([row['name'] for row in self.client.get('/api/bootstrap/').json()['auctions']], ['USS'])
+
+
+class OrderFixtureTestCase(OwnerTestCase):
+    """Two orders, one with items, a linked transaction and a company account."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        account = CompanyAccount.objects.create(
+            user=cls.user, bank_name='Bank', account_number='001', branch_code='01', account_holder='Owner'
+        )
+        tx = Transaction.objects.create(
+            user=cls.user, company_account=account, date=date(2024, 1, 1), withdraw=Decimal('1500.5'),
+            balance=Decimal('0'), description='Payment'
+        )
+        category = CarCategory.objects.create(user=cls.user, name='Toyota', company='Toyota Motor')
+        car = Car.objects.create(user=cls.user, category=category, model='Prius', chassis_number='ZVW30', year=2015)
+        linked = Order.objects.create(
+            user=cls.user, order_number='A-1', transaction_type='sale', transaction_catagory='local',
+            transaction_date=date(2024, 1, 2), total_amount=Decimal('2000'), company_account=account,
+            transaction=tx, other_details={'memo': 'ok'},
+        )
+        OrderItem.objects.create(order=linked, car=car, vehicle_price=Decimal('2000'))
+        OrderItem.objects.create(order=linked, car=car, venue='USS', transport_fee=Decimal('30'))
+        Order.objects.create(
+            user=cls.user, order_number='A-2', transaction_type='purchase', transaction_catagory='foreign',
+            transaction_date=date(2024, 1, 3), total_amount=Decimal('10'),
+        )
+
+
+class FastListTests(OrderFixtureTestCase):
+    def serialized(self, serializer_class, queryset):
+        return json.loads(JSONRenderer().render(serializer_class(queryset, many=True).data))
+
+    def test_orders_match_the_serializer(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/revenue/orders/')
+        expected = self.serialized(OrderSerializer, Order.objects.filter(user=self.user).order_by('-created_at'))
+        self.assertEqual(json.loads(response.content)['results'], expected)
+
+    def test_transactions_match_the_serializer(self):
+        response = self.client.get('/api/revenue/transactions/', {'pagination': 'cursor'})
+        expected = self.serialized(TransactionSerializer, Transaction.objects.filter(user=self.user))
+        self.assertEqual(json.loads(response.content)['results'], expected)
+
+    def test_renderer_matches_the_stdlib_renderer(self):
+        data = {
+            'amount': Decimal('12.50'), 'when': Order.objects.get(order_number='A-1').created_at,
+            'day': date(2024, 1, 2), 'text': '円\u2028', 'missing': None, 'rows': [1, 2.5, True],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class SparseFieldsetTests(OrderFixtureTestCase):
+    def test_fields_skip_the_item_query(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/revenue/orders/', {'fields': 'order_number,total_amount'})
+        self.assertEqual(response.json()['results'][-1], {'order_number': 'A-1', 'total_amount': '2000.00'})
+
+    def test_expand_adds_nested_objects(self):
+        response = self.client.get('/api/revenue/orders/', {'fields': 'order_number', 'expand': 'items,transaction'})
+        row = response.json()['results'][-1]
+        self.assertEqual(set(row), {'order_number', 'items', 'transaction'})
+        self.assertEqual(len(row['items']), 2)
+        self.assertEqual(row['transaction']['description'], 'Payment')
+
+    def test_empty_expand_drops_only_nested_objects(self):
+        row = self.client.get('/api/revenue/orders/', {'expand': ''}).json()['results'][-1]
+        self.assertNotIn('items', row)
+        self.assertNotIn('transaction', row)
+        self.assertEqual(row['company_account_name'], 'Bank')
+
+    def test_cursor_pages_work_without_the_ordering_fields(self):
+        params = {'pagination': 'cursor', 'pageSize': 1, 'fields': 'order_number'}
+        response = self.client.get('/api/revenue/orders/', params)
+        response = self.client.get(response.json()['next'])
+        self.assertEqual(response.json()['results'], [{'order_number': 'A-1'}])
+
+    def test_serializer_path_honours_fields(self):
+        order = Order.objects.get(order_number='A-1')
+        response = self.client.get(f'/api/revenue/orders/{order.pk}/', {'fields': 'id,transaction'})
+        self.assertEqual(set(response.json()), {'id', 'transaction'})
+
+    def test_writes_ignore_fields(self):
+        payload = {
+            'name': 'New', 'email': 'new@example.com', 'address': 'Tokyo', 'phone': '03', 'account_number': '1',
+            'branch_code': '1', 'bank_name': 'Bank',
+        }
+        response = self.client.post('/api/revenue/customers/?fields=id', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['name'], 'New')
+
+
+class ChangeFeedTests(OwnerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other = User.objects.create_user(username='other', email='other@example.com', password='secret')
+
+    def test_feed_returns_upserts_and_tombstones_after_seq(self):
+        kept = Customer.objects.create(user=self.user, name='Kept')
+        seq = self.client.get('/api/changes/').json()['seq']
+        kept.name = 'Renamed'
+        kept.save()
+        gone = Customer.objects.create(user=self.user, name='Gone')
+        gone_id = gone.pk
+        gone.delete()
+        Customer.objects.create(user=self.other, name='Theirs')
+
+        body = self.client.get('/api/changes/', {'since': seq}).json()
+        customers = body['changes']['customers']
+        self.assertEqual([row['name'] for row in customers['upserts']], ['Renamed'])
+        self.assertEqual(customers['upserts'][0], self.client.get(f'/api/revenue/customers/{kept.pk}/').json())
+        self.assertEqual(customers['deletes'], [gone_id])
+        self.assertFalse(body['has_more'])
+        self.assertEqual(self.client.get('/api/changes/', {'since': body['seq']}).json()['changes'], {})
+
+    def test_limit_pages_through_the_feed(self):
+        for name in ('A', 'B', 'C'):
+            Customer.objects.create(user=self.user, name=name)
+        first = self.client.get('/api/changes/', {'since': 0, 'limit': 2}).json()
+        self.assertTrue(first['has_more'])
+        rest = self.client.get('/api/changes/', {'since': first['seq'], 'limit': 2}).json()
+        self.assertFalse(rest['has_more'])
+        self.assertEqual([row['name'] for row in rest['changes']['customers']['upserts']], ['C'])
+
+    def test_order_items_are_attributed_to_the_order_owner(self):
+        order = Order.objects.create(
+            user=self.user, order_number='CF-1', transaction_type='sale', transaction_date=date(2024, 1, 1), total_amount=0
+        )
+        category = CarCategory.objects.create(user=self.user, name='Prius', company='Toyota')
+        car = Car.objects.create(user=self.user, category=category, model='ZVW30', chassis_number='CF-1', year=2015)
+        item = OrderItem.objects.create(order=order, car=car, car_category=category, vehicle_price=Decimal('1'))
+        changes = self.client.get('/api/changes/', {'since': 0}).json()['changes']
+        self.assertEqual([row['id'] for row in changes['order_items']['upserts']], [item.pk])
+
+    def test_invalid_since_is_rejected(self):
+        self.assertEqual(self.client.get('/api/changes/', {'since': 'x'}).status_code, 400)
+
+
+class DashboardStreamTests(OwnerTestCase):
+    token_auth = True
+
+    def snapshot(self, **totals):
+        data = dict.fromkeys(('approved_amount', 'pending_amount', 'total_expense', 'total_purchase'), 0.0)
+        data.update(totals, latest_orders=totals.pop('latest_orders', []))
+        return data
+
+    def test_delta_carries_changed_totals_and_new_orders(self):
+        old = {'transaction_date': date(2024, 1, 1), 'total_amount': 1}
+        new = {'transaction_date': date(2024, 2, 1), 'total_amount': 2}
+        previous = self.snapshot(latest_orders=[old])
+        current = self.snapshot(pending_amount=2.0, latest_orders=[new, old])
+        self.assertEqual(dashboard_delta(previous, current), ('delta', {'pending_amount': 2.0, 'new_orders': [new]}))
+        self.assertIsNone(dashboard_delta(current, current))
+        self.assertEqual(dashboard_delta(current, previous), ('snapshot', previous))
+
+    def create_order(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.create(
+                user=self.user, order_number='LIVE-1', transaction_type='sale', transaction_date=date(2024, 3, 1),
+                payment_status='pending', total_amount=Decimal('500'),
+            )
+
+    async def test_stream_pushes_a_delta_when_an_order_is_saved(self):
+        response = await AsyncClient().get(
+            '/api/revenue/orders/dashboard/stream/', headers={'Authorization': f'Token {self.token.key}'}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = response.streaming_content
+        first = await asyncio.wait_for(events.__anext__(), 5)
+        self.assertIn(b'event: snapshot', first)
+
+        await sync_to_async(self.create_order)()
+        event = await asyncio.wait_for(events.__anext__(), 5)
+        name, data = event.split(b'\n')[:2]
+        self.assertEqual(name, b'event: delta')
+        delta = json.loads(data[len(b'data: '):])
+        self.assertEqual(delta['pending_amount'], 500.0)
+        self.assertEqual([order['total_amount'] for order in delta['new_orders']], [500.0])
+        await events.aclose()
+
+    async def test_stream_requires_a_valid_token(self):
+        response = await AsyncClient().get('/api/revenue/orders/dashboard/stream/', {'token': 'nope'})
+        self.assertEqual(response.status_code, 401)
+
+
+class BatchTests(OwnerTestCase):
+    token_auth = True
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Customer.objects.create(user=cls.user, name='Mine')
+
+    def batch(self, requests, **options):
+        return self.client.post('/api/batch/', {'requests': requests, **options}, format='json')
+
+    def test_sub_requests_run_in_order_as_the_batch_user(self):
+        response = self.batch([
+            {'method': 'GET', 'path': '/api/revenue/customers/'},
+            {'method': 'POST', 'path': '/api/revenue/auctions/', 'body': {'name': 'USS'}},
+            {'method': 'GET', 'path': '/api/revenue/orders/dashboard/'},
+            {'method': 'GET', 'path': '/api/revenue/nowhere/'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        first, created, dashboard, missing = response.json()['responses']
+        self.assertEqual([row['name'] for row in first['body']['results']], ['Mine'])
+        self.assertEqual((created['status'], created['body']['name']), (201, 'USS'))
+        self.assertEqual(dashboard['body']['approved_amount'], 0)
+        self.assertEqual(missing['status'], 404)
+        self.assertEqual(Auction.objects.get().user, self.user)
+
+    def test_atomic_batch_rolls_back_on_the_first_failure(self):
+        response = self.batch([
+            {'method': 'POST', 'path': '/api/revenue/auctions/', 'body': {'name': 'USS'}},
+            {'method': 'POST', 'path': '/api/revenue/auctions/', 'body': {}},
+            {'method': 'POST', 'path': '/api/revenue/auctions/', 'body': {'name': 'TAA'}},
+        ], atomic=True)
+        body = response.json()
+        self.assertTrue(body['rolled_back'])
+        self.assertEqual([entry['status'] for entry in body['responses']], [201, 400])
+        self.assertFalse(Auction.objects.exists())
+
+    def test_rolled_back_reads_do_not_reach_the_caches(self):
+        response = self.batch([
+            {'method': 'POST', 'path': '/api/revenue/customers/', 'body': {
+                'name': 'Ghost', 'email': 'ghost@example.com', 'address': 'Nowhere', 'phone': '0',
+                'account_number': '1', 'branch_code': '1', 'bank_name': 'Bank',
+            }},
+            {'method': 'GET', 'path': '/api/bootstrap/'},
+            {'method': 'GET', 'path': '/api/revenue/customers/'},
+            {'method': 'GET', 'path': '/api/nope/'},
+        ], atomic=True)
+        _, bundle, customers, _ = response.json()['responses']
+        self.assertTrue(response.json()['rolled_back'])
+        self.assertEqual([row['name'] for row in bundle['body']['customers']], ['Mine', 'Ghost'])
+        self.assertNotIn('ETag', bundle['headers'])
+        self.assertEqual(customers['body']['count'], 2)
+
+        bundle = self.client.get('/api/bootstrap/').json()
+        self.assertEqual([row['name'] for row in bundle['customers']], ['Mine'])
+        customers = self.client.get('/api/revenue/customers/').json()
+        self.assertEqual((customers['count'], len(customers['results'])), (1, 1))
+
+    def test_invalid_batches_are_rejected(self):
+        self.assertEqual(self.batch([]).status_code, 400)
+        self.assertEqual(self.batch([{'method': 'TRACE', 'path': '/api/revenue/auctions/'}]).status_code, 400)
+        nested = self.batch([{'method': 'POST', 'path': '/api/batch/', 'body': {'requests': []}}])
+        self.assertEqual(nested.json()['responses'][0]['status'], 400)
+
+
+class ServerTimingTests(OwnerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Customer.objects.create(user=cls.user, name='Mine')
+
+    def timings(self, response):
+        return dict(entry.split(';', 1) for entry in response['Server-Timing'].split(', '))
+
+    def test_header_reports_queries_and_serialization(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/revenue/customers/')
+        timings = self.timings(response)
+        self.assertIn(f'desc="{len(queries)} queries"', timings['db'])
+        self.assertIn('serialize', timings)
+        self.assertIn('total', timings)
+
+    def test_async_view_queries_are_counted(self):
+        timings = self.timings(self.client.get('/api/revenue/orders/dashboard/'))
+        self.assertIn('desc="3 queries"', timings['db'])
+
+    @override_settings(REQUEST_TIMING_SLOW_QUERIES=1)
+    def test_slow_requests_are_logged(self):
+        with self.assertLogs('project.timing', 'WARNING') as logs:
+            self.client.get('/api/revenue/customers/')
+        self.assertIn('GET /api/revenue/customers/: 200', logs.output[0])
+
+    @override_settings(REQUEST_TIMING_SLOW_QUERIES=1)
+    def test_logged_path_leaves_out_credentials(self):
+        with self.assertLogs('project.timing', 'WARNING') as logs:
+            self.client.get('/api/revenue/customers/', {'token': 'secret-key', 'page': 1})
+        self.assertIn('GET /api/revenue/customers/?page=1: 200', logs.output[0])
+        self.assertNotIn('secret-key', logs.output[0])
+
+    def test_serializer_data_is_timed_once(self):
+        timings = timing.RequestTimings()
+        token = timing._current.set(timings)
+        try:
+            CustomerSerializer(Customer.objects.all(), many=True).data
+        finally:
+            timing._current.reset(token)
+        self.assertGreater(timings.durations['serialize'], 0)
+        self.assertEqual(timings.running, set())
@@ -0,0 +1,138 @@
+"""Async upstream client for the translate-batch endpoint.
+
+Texts are split into chunks and sent concurrently over one
+``httpx.AsyncClient``. The client, and the semaphore bounding in-flight chunks
+to ``TRANSLATION_MAX_CONCURRENCY`` for the whole process, live on a dedicated
+event loop in a daemon thread: callers on any loop (an ASGI worker, or the
+short-lived loops ``async_to_sync`` creates under WSGI) hand their chunks to
+it and await the result, so connections are pooled across requests and no
+client is left behind on a finished loop. A circuit breaker stops calling
+upstream for ``TRANSLATION_BREAKER_RESET`` seconds after
+``TRANSLATION_BREAKER_THRESHOLD`` consecutive failures.
+"""
+import asyncio
+import threading
+import time
+
+import httpx
+from django.conf import settings
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError('Translation service is temporarily unavailable')
+            # Half-open: let this call through as a probe.
+            self._opened_at = None
+            self._failures = self.threshold - 1
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+
+    def reset(self):
+        self.record_success()
+
+
+breaker = CircuitBreaker(
+    getattr(settings, 'TRANSLATION_BREAKER_THRESHOLD', 5),
+    getattr(settings, 'TRANSLATION_BREAKER_RESET', 30),
+)
+
+_loop = None
+_loop_lock = threading.Lock()
+# Client and semaphore, created on (and only used from) the upstream loop.
+_upstream = {}
+
+
+def upstream_loop():
+    """The process-wide event loop that talks to the translation service, started on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='translate-upstream', daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def _get_upstream():
+    if not _upstream:
+        _upstream['client'] = httpx.AsyncClient(
+            pool_limits=httpx.PoolLimits(
+                max_keepalive=settings.TRANSLATION_MAX_CONCURRENCY,
+                max_connections=settings.TRANSLATION_MAX_CONCURRENCY,
+            ),
+        )
+        _upstream['semaphore'] = asyncio.Semaphore(settings.TRANSLATION_MAX_CONCURRENCY)
+    return _upstream['client'], _upstream['semaphore']
+
+
+def _parse_chunk(payload, chunk):
+    # translate_a/t answers with one entry per ``q``; an entry is either the
+    # translated string or ``[translated, detected_source_lang]``.
+    if isinstance(payload, str):
+        payload = [payload]
+    if len(chunk) == 1 and len(payload) != 1:
+        payload = [payload]
+    if len(payload) != len(chunk):
+        raise ValueError('Unexpected response from translation service')
+    return [entry[0] if isinstance(entry, list) else entry for entry in payload]
+
+
+async def _translate_chunk(client, semaphore, chunk, target_lang):
+    breaker.before_call()
+    params = [('client', 'gtx'), ('sl', 'auto'), ('tl', target_lang)] + [('q', text) for text in chunk]
+    async with semaphore:
+        try:
+            response = await client.get(
+                settings.TRANSLATION_UPSTREAM_URL, params=params, timeout=settings.TRANSLATION_TIMEOUT
+            )
+            response.raise_for_status()
+            translated = _parse_chunk(response.json(), chunk)
+        except (httpx.HTTPError, ValueError):
+            breaker.record_failure()
+            raise
+    breaker.record_success()
+    return translated
+
+
+async def _translate_chunks(chunks, target_lang):
+    client, semaphore = _get_upstream()
+    return await asyncio.gather(
+        *(_translate_chunk(client, semaphore, chunk, target_lang) for chunk in chunks)
+    )
+
+
+async def translate_many(texts, target_lang):
+    """Translate ``texts`` upstream in concurrent chunks, preserving order."""
+    if not texts:
+        return []
+    breaker.before_call()
+    size = settings.TRANSLATION_CHUNK_SIZE
+    chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+    # Cancelling this await cancels the chunks still running upstream.
+    future = asyncio.run_coroutine_threadsafe(_translate_chunks(chunks, target_lang), upstream_loop())
+    results = await asyncio.wrap_future(future)
+    return [text for chunk in results for text in chunk]
@@ -1,8 +1,13 @@
+import json
+
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from googletrans import Translator
-
-translator = Translator()
+from apps.revenue.translate_client import CircuitOpenError
+from apps.revenue.translation import atranslate_texts, translate_texts
 
 @api_view(['POST'])
 def translate_text(request):
@@ -13,22 +18,36 @@ def translate_text(request):
         return Response({'error': 'Text is required'}, status=400)
     
     try:
-        result = translator.translate(text, dest=target_lang)
-        return Response({'text': result.text})
+        translated = translate_texts([text], target_lang)
+        return Response({'text': translated[0]})
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
-@api_view(['POST'])
-def translate_batch(request):
-    texts = request.data.get('texts', [])
-    target_lang = request.data.get('target_lang', 'ja')
-    
-    if not texts:
-        return Response({'error': 'Texts array is required'}, status=400)
-    
-    try:
-        results = translator.translate(texts, dest=target_lang)
-        translated = [r.text for r in results]
-        return Response({'texts': translated})
-    except Exception as e:
-        return Response({'error': str(e)}, status=500)
+@method_decorator(csrf_exempt, name='dispatch')
+class TranslateBatchView(View):
+    """Async batch translation; runs natively under project.asgi and via async_to_sync under WSGI."""
+
+    async def post(self, request):
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+        if not isinstance(payload, dict):
+            return JsonResponse({'error': 'JSON object body is required'}, status=400)
+        texts = payload.get('texts', [])
+        target_lang = payload.get('target_lang', 'ja')
+
+        if not texts:
+            return JsonResponse({'error': 'Texts array is required'}, status=400)
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return JsonResponse({'error': 'Texts must be an array of strings'}, status=400)
+        if not isinstance(target_lang, str):
+            return JsonResponse({'error': 'target_lang must be a string'}, status=400)
+
+        try:
+            translated = await atranslate_texts(texts, target_lang)
+            return JsonResponse({'texts': translated})
+        except CircuitOpenError as e:
+            return JsonResponse({'error': str(e)}, status=503)
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
@@ -0,0 +1,113 @@
+"""Cached translation lookups for the translate endpoints.
+
+Translations are looked up in a process-local LRU first, then in the
+``translations`` table, and only the remaining misses are sent upstream:
+through ``settings.TRANSLATOR_CLASS`` for sync callers, or through
+``translate_client`` for the async batch view.
+"""
+import hashlib
+import threading
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from apps.revenue import translate_client
+from apps.revenue.models import Translation
+from project.lru import LRUCache
+
+
+def source_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+memory_cache = LRUCache(getattr(settings, 'TRANSLATION_CACHE_SIZE', 5000))
+
+_translator = None
+_translator_lock = threading.Lock()
+
+
+def get_translator():
+    global _translator
+    if _translator is None:
+        with _translator_lock:
+            if _translator is None:
+                _translator = import_string(settings.TRANSLATOR_CLASS)()
+    return _translator
+
+
+def reset_translator():
+    global _translator
+    _translator = None
+
+
+class StubTranslator:
+    """Offline translator for tests and local development; tags text with the target language."""
+
+    def __init__(self):
+        self.calls = []
+
+    def translate(self, text, dest='en', src='auto'):
+        self.calls.append((text, dest))
+        if isinstance(text, list):
+            return [SimpleNamespace(text=f'[{dest}] {item}', dest=dest) for item in text]
+        return SimpleNamespace(text=f'[{dest}] {text}', dest=dest)
+
+
+def _lookup(texts, target_lang):
+    """Split distinct ``texts`` into known translations and the list still to translate."""
+    translated = {}
+    missing_hashes = {}
+    for text in dict.fromkeys(texts):
+        key = (source_hash(text), target_lang)
+        hit = memory_cache.get(key)
+        if hit is not None:
+            translated[text] = hit
+        else:
+            missing_hashes[key[0]] = text
+
+    if missing_hashes:
+        stored = Translation.objects.filter(
+            target_lang=target_lang, source_hash__in=list(missing_hashes)
+        ).values_list('source_hash', 'translated_text')
+        for hash_value, translated_text in stored:
+            text = missing_hashes.pop(hash_value)
+            translated[text] = translated_text
+            memory_cache.set((hash_value, target_lang), translated_text)
+
+    return translated, list(missing_hashes.values())
+
+
+def _store(pairs, target_lang):
+    rows = []
+    for text, translated_text in pairs:
+        hash_value = source_hash(text)
+        memory_cache.set((hash_value, target_lang), translated_text)
+        rows.append(Translation(
+            source_hash=hash_value,
+            target_lang=target_lang,
+            source_text=text,
+            translated_text=translated_text,
+        ))
+    Translation.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def translate_texts(texts, target_lang):
+    """Translate ``texts`` to ``target_lang``, sending each distinct cache miss upstream once."""
+    translated, misses = _lookup(texts, target_lang)
+    if misses:
+        results = [result.text for result in get_translator().translate(misses, dest=target_lang)]
+        translated.update(zip(misses, results))
+        _store(zip(misses, results), target_lang)
+    return [translated[text] for text in texts]
+
+
+async def atranslate_texts(texts, target_lang):
+    """Async variant of ``translate_texts`` that fans misses out through ``translate_client``."""
+    translated, misses = await sync_to_async(_lookup)(texts, target_lang)
+    if misses:
+        results = await translate_client.translate_many(misses, target_lang)
+        translated.update(zip(misses, results))
+        await sync_to_async(_store)(list(zip(misses, results)), target_lang)
+    return [translated[text] for text in texts]
@@ -1,7 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from apps.revenue.views import CarCategoryViewSet, CarViewSet, OrderViewSet, OrderItemViewSet, CustomerViewSet, SalerViewSet, CompanyAccountViewSet, AuctionViewSet, TransactionViewSet
-from apps.revenue.translate_views import translate_text, translate_batch
+from apps.revenue.live_views import DashboardStreamView
+from apps.revenue.report_views import DashboardView, FinancialReportView, ReportsView
+from apps.revenue.translate_views import translate_text, TranslateBatchView
 
 router = DefaultRouter()
 router.register('categories', CarCategoryViewSet, basename='category')
@@ -15,8 +17,11 @@ router.register('auctions', AuctionViewSet, basename='auction')
 router.register('transactions', TransactionViewSet, basename='transaction')
 
 urlpatterns = [
+    path('orders/dashboard/', DashboardView.as_view(), name='order-dashboard'),
+    path('orders/dashboard/stream/', DashboardStreamView.as_view(), name='order-dashboard-stream'),
+    path('orders/reports/', ReportsView.as_view(), name='order-reports'),
+    path('orders/financial_report/', FinancialReportView.as_view(), name='order-financial-report'),
     path('', include(router.urls)),
-    path('orders/dashboard/', OrderViewSet.as_view({'get': 'dashboard'}), name='order-dashboard'),
     path('translate/', translate_text, name='translate'),
-    path('translate-batch/', translate_batch, name='translate-batch'),
+    path('translate-batch/', TranslateBatchView.as_view(), name='translate-batch'),
 ]
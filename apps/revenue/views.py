@@ -2,9 +2,10 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.throttling import ScopedRateThrottle
 from django.db import transaction, IntegrityError
 from django.http import HttpResponse
-from django.db.models import Sum, Q
+from django.db.models import Q
 from datetime import datetime
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib import colors
@@ -13,12 +14,18 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side
+from apps.revenue import changes
+from apps.revenue.filters import transaction_search_q
 from apps.revenue.models import Car, CarCategory, Order, OrderItem, Customer, Saler, CompanyAccount, Auction, Transaction
 from apps.revenue.serializers import CarSerializer, CarCategorySerializer, OrderSerializer, OrderItemSerializer, CreateOrderSerializer, CustomerSerializer, SalerSerializer, CompanyAccountSerializer, AuctionSerializer, TransactionSerializer
-from project.pagination import CustomPageNumberPagination
-from apps.expense.models import Expense
+from project import generations
+from project.admission import admit
+from project.conditional import ConditionalGetMixin, conditional
+from project.fast_lists import ValuesListMixin, column_lookups, compile_fields, map_rows
+from project.fts import search_queryset
+from project.pagination import CachedCountPagination, ListPagination
+from project.timing import measure
+from project.write_lock import serialize_writes
 from django.conf import settings
 from apps.account.models import User
 from reportlab.pdfbase.cidfonts import UnicodeCIDFont
@@ -26,7 +33,48 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.platypus import Image
 from reportlab.lib.utils import ImageReader
 
-class CarCategoryViewSet(viewsets.ModelViewSet):
+# values() fast path for the list endpoints (project.fast_lists): output
+# name and lookup per serializer field, in serializer order.
+CAR_LIST_FIELDS = (
+    ('id', 'id'), ('category', 'category'), ('category_name', 'category__name'),
+    ('company_name', 'category__company'), ('description', 'description'), ('model', 'model'),
+    ('chassis_number', 'chassis_number'), ('year', 'year'), ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+)
+ORDER_LIST_FIELDS = (
+    ('id', 'id'), ('order_number', 'order_number'), ('transaction_type', 'transaction_type'),
+    ('transaction_catagory', 'transaction_catagory'), ('transaction_date', 'transaction_date'),
+    ('payment_status', 'payment_status'), ('customer_name', 'customer_name'), ('total_amount', 'total_amount'),
+    ('notes', 'notes'), ('items', None), ('other_details', 'other_details'), ('auction', 'auction'),
+    ('auction_name', 'auction__name'), ('customer', 'customer'), ('customer_name_obj', 'customer__name'),
+    ('saler', 'saler'), ('saler_name_obj', 'saler__name'), ('company_account', 'company_account'),
+    ('company_account_name', 'company_account__bank_name'),
+    ('transaction', (
+        ('id', 'transaction__id'), ('description', 'transaction__description'),
+        ('withdraw', 'transaction__withdraw'), ('date', 'transaction__date'),
+    )),
+    ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+)
+ORDER_ITEM_LIST_FIELDS = (
+    ('id', 'id'), ('car', 'car'), ('car_name', 'car__category__name'), ('car_category', 'car_category'),
+    ('model', 'car__model'), ('chassis_number', 'car__chassis_number'), ('year', 'car__year'),
+    ('venue', 'venue'), ('notes', 'notes'), ('vehicle_price', 'vehicle_price'),
+    ('vehicle_price_tax', 'vehicle_price_tax'), ('recycle_fee', 'recycle_fee'), ('listing_fee', 'listing_fee'),
+    ('listing_fee_tax', 'listing_fee_tax'), ('successful_bid', 'successful_bid'),
+    ('successful_bid_tax', 'successful_bid_tax'), ('commission_fee', 'commission_fee'),
+    ('commission_fee_tax', 'commission_fee_tax'), ('transport_fee', 'transport_fee'),
+    ('transport_fee_tax', 'transport_fee_tax'), ('registration_fee', 'registration_fee'),
+    ('registration_fee_tax', 'registration_fee_tax'), ('canceling_fee', 'canceling_fee'), ('subtotal', 'subtotal'),
+)
+TRANSACTION_LIST_FIELDS = (
+    ('id', 'id'), ('date', 'date'), ('transaction_id', 'transaction_id'), ('withdraw', 'withdraw'),
+    ('deposit', 'deposit'), ('balance', 'balance'), ('description', 'description'), ('notes', 'notes'),
+    ('company_account', 'company_account'), ('company_account_name', 'company_account__bank_name'),
+    ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+)
+
+
+class CarCategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = CarCategorySerializer
     permission_classes = [IsAuthenticated]
 
@@ -35,11 +83,11 @@ class CarCategoryViewSet(viewsets.ModelViewSet):
         search = self.request.query_params.get('search')
         
         if search:
-            queryset = queryset.filter(
+            queryset = search_queryset(queryset, search, (
                 Q(name__icontains=search) |
                 Q(company__icontains=search) |
                 Q(description__icontains=search)
-            )
+            ), ranked=True)
         
         return queryset
 
@@ -47,34 +95,39 @@ class CarCategoryViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
     
     @action(detail=False, methods=['get'])
+    @conditional
     def all(self, request):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        def build():
+            return self.get_serializer(self.get_queryset(), many=True).data
+
+        data = generations.cached(
+            'car_categories_all', request.user.id, [CarCategory], build,
+            params=request.query_params.get('search'),
+        )
+        return Response(data)
 
-class CarViewSet(viewsets.ModelViewSet):
+class CarViewSet(ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet):
     serializer_class = CarSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = CustomPageNumberPagination
+    pagination_class = ListPagination
+    keyset_ordering = ('-id',)
+    etag_models = (Car, CarCategory)
+    list_fields = CAR_LIST_FIELDS
 
     def get_queryset(self):
         return Car.objects.filter(user=self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
-    
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet):
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ListPagination
+    keyset_ordering = ('-created_at', '-id')
+    etag_models = (Order, OrderItem, Car, CarCategory, Auction, Customer, Saler, CompanyAccount, Transaction)
+    list_fields = ORDER_LIST_FIELDS
+    throttle_scope = None
 
     def get_queryset(self):
         queryset = Order.objects.filter(user=self.request.user).order_by('-created_at')
@@ -97,16 +150,30 @@ class OrderViewSet(viewsets.ModelViewSet):
         if end_date:
             queryset = queryset.filter(transaction_date__lte=end_date)
         if search:
-            queryset = queryset.filter(
+            queryset = search_queryset(queryset, search, (
                 Q(order_number__icontains=search) |
                 Q(customer_name__icontains=search) |
                 Q(notes__icontains=search)
-            )
+            ))
         
         return queryset
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    def map_list_rows(self, rows):
+        data = super().map_list_rows(rows)
+        if not data or 'items' not in data[0]:
+            return data
+        columns = compile_fields(OrderItem, ORDER_ITEM_LIST_FIELDS)
+        item_rows = OrderItem.objects.filter(order_id__in=[row['id'] for row in rows]).order_by('order_id', 'id')
+        item_rows = list(item_rows.values('order_id', *column_lookups(columns)))
+        items = {}
+        for row, item in zip(item_rows, map_rows(columns, item_rows)):
+            items.setdefault(row['order_id'], []).append(item)
+        for row, order in zip(rows, data):
+            order['items'] = items.get(row['id'], [])
+        return data
     
     def update(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -115,25 +182,6 @@ class OrderViewSet(viewsets.ModelViewSet):
         self.perform_update(serializer)
         return Response(serializer.data)
 
-    @action(detail=False, methods=['get'])
-    def dashboard(self, request):
-        orders = Order.objects.filter(user=request.user)
-        expenses = Expense.objects.filter(user=request.user)
-        
-        approved_amount = orders.filter(payment_status='completed').aggregate(total=Sum('total_amount'))['total'] or 0
-        pending_amount = orders.filter(payment_status='pending').aggregate(total=Sum('total_amount'))['total'] or 0
-        total_expense = expenses.aggregate(total=Sum('amount'))['total'] or 0
-        total_purchase = orders.filter(transaction_type='purchase').aggregate(total=Sum('total_amount'))['total'] or 0
-        latest_orders = orders.order_by('-transaction_date')[:10].values('transaction_date', 'transaction_type', 'payment_status', 'total_amount')
-        
-        return Response({
-            'approved_amount': float(approved_amount),
-            'pending_amount': float(pending_amount),
-            'total_expense': float(total_expense),
-            'total_purchase': float(total_purchase),
-            'latest_orders': list(latest_orders)
-        })
-
     def _calculate_item_total(self, item):
         order_type = self.request.data.get('transaction_type', 'sale')
         
@@ -233,6 +281,7 @@ class OrderViewSet(viewsets.ModelViewSet):
             raise
 
     @action(detail=False, methods=['post'])
+    @serialize_writes
     def create_with_items(self, request):
         serializer = CreateOrderSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -359,6 +408,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
     
     @action(detail=True, methods=['post'])
+    @serialize_writes
     def update_with_items(self, request, pk=None):
         order = self.get_object()
         serializer = CreateOrderSerializer(data=request.data)
@@ -605,7 +655,8 @@ class OrderViewSet(viewsets.ModelViewSet):
 
         canvas.restoreState()
 
-    @action(detail=True, methods=['get'])
+    @action(detail=True, methods=['get'], throttle_classes=[ScopedRateThrottle], throttle_scope='invoice')
+    @admit('generate_invoice')
     def generate_invoice(self, request, pk=None):
         order = self.get_object()
         is_auction = order.transaction_type == 'auction'
@@ -663,11 +714,12 @@ class OrderViewSet(viewsets.ModelViewSet):
             elements.append(self._build_auction_table(order, doc, styles))
             # elements.append(self._build_standard_table(order, doc, styles))
 
-        doc.build(
-            elements,
-            onFirstPage=self._add_page_decorations,
-            onLaterPages=self._add_page_decorations,
-        )
+        with measure('render'):
+            doc.build(
+                elements,
+                onFirstPage=self._add_page_decorations,
+                onLaterPages=self._add_page_decorations,
+            )
 
         return response
 
@@ -678,7 +730,6 @@ class OrderViewSet(viewsets.ModelViewSet):
         self._add_watermark(canvas, doc, "Ilyas Sons 合同会社")
 
         logo_path = os.path.join(settings.MEDIA_ROOT, "logo.png")
-        print(logo_path)
         if os.path.exists(logo_path):
             logo = ImageReader(logo_path)
 
@@ -1026,216 +1077,57 @@ class OrderViewSet(viewsets.ModelViewSet):
         return Paragraph(f" 総計 : ¥ {grand_total:,.0f}", style)
 
 
-    @action(detail=False, methods=['get'])
-    def financial_report(self, request):
-        period = request.query_params.get('period', 'month')
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
-        
-        today = datetime.now().date()
-        
-        if start_date and end_date:
-            start = datetime.strptime(start_date, '%Y-%m-%d').date()
-            end = datetime.strptime(end_date, '%Y-%m-%d').date()
-        elif period == 'today':
-            start = end = today
-        elif period == 'month':
-            start = today.replace(day=1)
-            end = today
-        elif period == 'year':
-            start = today.replace(month=1, day=1)
-            end = today
-        else:
-            start = today.replace(day=1)
-            end = today
-        
-        orders = Order.objects.filter(user=request.user, transaction_date__range=[start, end])
-        expenses = Expense.objects.filter(user=request.user, date__range=[start, end])
-        
-        sales = orders.filter(transaction_type='sale').aggregate(total=Sum('total_amount'))['total'] or 0
-        purchases = orders.filter(transaction_type='purchase').aggregate(total=Sum('total_amount'))['total'] or 0
-        auctions = orders.filter(transaction_type='auction').aggregate(total=Sum('total_amount'))['total'] or 0
-        total_expenses = expenses.aggregate(total=Sum('amount'))['total'] or 0
-        
-        revenue = sales + auctions
-        cost = purchases + total_expenses
-        profit = revenue - cost
-        
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'Financial Report'
-        
-        ws['A1'] = 'Financial Report'
-        ws['A1'].font = Font(size=16, bold=True)
-        ws['A2'] = f'Period: {start} to {end}'
-        
-        ws['A4'] = 'Summary'
-        ws['A4'].font = Font(bold=True)
-        ws['A5'] = 'Currency'
-        ws['B5'] = '¥'
-        ws['A6'] = 'Total Revenue (Sales + Auctions)'
-        ws['B6'] = f'¥ {float(revenue)}'
-        ws['A7'] = 'Total Cost (Purchases + Expenses)'
-        ws['B7'] = f'¥ {float(cost)}'
-        ws['A8'] = 'Net Profit'
-        ws['B8'] = f'¥ {float(profit)}'
-        ws['B9'].font = Font(bold=True)
-        
-        ws['A10'] = 'Breakdown'
-        ws['A10'].font = Font(bold=True)
-        ws['A11'] = 'Sales'
-        ws['B11'] = f'¥ {float(sales)}'
-        ws['A12'] = 'Auctions'
-        ws['B12'] = f'¥ {float(auctions)}'
-        ws['A13'] = 'Purchases'
-        ws['B13'] = f'¥ {float(purchases)}'
-        ws['A14'] = 'Expenses'
-        ws['B14'] = f'¥ {float(total_expenses)}'
-        
-        ws['A16'] = 'Transactions Detail'
-        ws['A16'].font = Font(bold=True)
-        ws.append(['Type', 'Date', 'Payment Status', 'Amount'])
-        
-        for order in orders:
-            ws.append([order.transaction_type.capitalize(), order.transaction_date.strftime('%Y-%m-%d'), 
-                      order.payment_status, f'¥ {float(order.total_amount)}'])
-        
-        for exp in expenses:
-            ws.append(['Expense', exp.date.strftime('%Y-%m-%d'), 'completed', f'¥ {float(exp.amount)}'])
-        
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename="Report {start}_{end}.xlsx"'
-        wb.save(response)
-        return response
-
-
-
-    @action(detail=False, methods=['get'])
-    def reports(self, request):
-        from rest_framework.pagination import PageNumberPagination
-        
-        report_type = request.query_params.get('type', 'orders')
-        period = request.query_params.get('period', 'month')
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
-        payment_status = request.query_params.get('payment_status')
-        search = request.query_params.get('search')
-        page_size = int(request.query_params.get('pageSize', 10))
-        
-        today = datetime.now().date()
-        
-        if start_date and end_date:
-            start = datetime.strptime(start_date, '%Y-%m-%d').date()
-            end = datetime.strptime(end_date, '%Y-%m-%d').date()
-        elif period == 'today':
-            start = end = today
-        elif period == 'month':
-            start = today.replace(day=1)
-            end = today
-        elif period == 'year':
-            start = today.replace(month=1, day=1)
-            end = today
-        else:
-            start = today.replace(day=1)
-            end = today
-        
-        data = []
-        
-        if report_type in ['all', 'expenses']:
-            if period == 'all':
-                expenses = Expense.objects.filter(user=request.user)
-            else:
-                expenses = Expense.objects.filter(user=request.user, date__range=[start, end])
-            if search:
-                expenses = expenses.filter(Q(description__icontains=search))
-            for exp in expenses:
-                data.append({
-                    'transaction_type': 'expense',
-                    'transaction_date': exp.date,
-                    'payment_status': 'completed',
-                    'total_amount': exp.amount
-                })
-        
-        if report_type in ['all', 'orders', 'sales', 'purchases', 'auctions']:
-            if period == 'all':
-                queryset = Order.objects.filter(user=request.user)
-            else:
-                queryset = Order.objects.filter(user=request.user, transaction_date__range=[start, end])
-            
-            if report_type == 'sales':
-                queryset = queryset.filter(transaction_type='sale')
-            elif report_type == 'purchases':
-                queryset = queryset.filter(transaction_type='purchase')
-            elif report_type == 'auctions':
-                queryset = queryset.filter(transaction_type='auction')
-            
-            if payment_status:
-                queryset = queryset.filter(payment_status=payment_status)
-            if search:
-                queryset = queryset.filter(Q(order_number__icontains=search) | Q(customer_name__icontains=search))
-            
-            for order in queryset.values('transaction_type', 'transaction_date', 'payment_status', 'total_amount'):
-                data.append(order)
-        
-        data.sort(key=lambda x: x['transaction_date'], reverse=True)
-        
-        paginator = PageNumberPagination()
-        paginator.page_size = page_size
-        paginated = paginator.paginate_queryset(data, request)
-        
-        return paginator.get_paginated_response(paginated)
-
-
-class OrderItemViewSet(viewsets.ModelViewSet):
+class OrderItemViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = OrderItemSerializer
     permission_classes = [IsAuthenticated]
+    etag_models = (OrderItem, Car, CarCategory)
 
     def get_queryset(self):
         return OrderItem.objects.filter(order__user=self.request.user)
 
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = CustomerSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = CustomPageNumberPagination
+    pagination_class = CachedCountPagination
 
     def get_queryset(self):
         queryset = Customer.objects.filter(user=self.request.user)
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
+            queryset = search_queryset(queryset, search, (
                 Q(name__icontains=search) |
                 Q(email__icontains=search) |
                 Q(phone__icontains=search)
-            )
+            ), ranked=True)
         return queryset
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class SalerViewSet(viewsets.ModelViewSet):
+class SalerViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = SalerSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = CustomPageNumberPagination
+    pagination_class = CachedCountPagination
 
     def get_queryset(self):
         queryset = Saler.objects.filter(user=self.request.user)
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
+            queryset = search_queryset(queryset, search, (
                 Q(name__icontains=search) |
                 Q(email__icontains=search) |
                 Q(phone__icontains=search)
-            )
+            ), ranked=True)
         return queryset
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class CompanyAccountViewSet(viewsets.ModelViewSet):
+class CompanyAccountViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = CompanyAccountSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = CustomPageNumberPagination
+    pagination_class = CachedCountPagination
 
     def get_queryset(self):
         queryset = CompanyAccount.objects.filter(user=self.request.user)
@@ -1250,44 +1142,41 @@ class CompanyAccountViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class AuctionViewSet(viewsets.ModelViewSet):
+class AuctionViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = AuctionSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = CustomPageNumberPagination
+    pagination_class = CachedCountPagination
 
     def get_queryset(self):
         queryset = Auction.objects.filter(user=self.request.user)
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
+            queryset = search_queryset(queryset, search, (
                 Q(name__icontains=search) |
                 Q(description__icontains=search)
-            )
+            ), ranked=True)
         return queryset
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class TransactionViewSet(viewsets.ModelViewSet):
+class TransactionViewSet(ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet):
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = CustomPageNumberPagination
+    pagination_class = ListPagination
+    keyset_ordering = ('-date', '-id')
+    etag_models = (Transaction, CompanyAccount)
+    list_fields = TRANSACTION_LIST_FIELDS
+    throttle_scope = None
 
     def get_queryset(self):
-        queryset = Transaction.objects.filter(user=self.request.user).order_by('-date', '-id')
+        queryset = Transaction.objects.filter(user=self.request.user).select_related('company_account').order_by('-date', '-id')
         search = self.request.query_params.get('search')
         date = self.request.query_params.get('date')
         company_account = self.request.query_params.get('company_account')
         
         if search:
-            queryset = queryset.filter(
-                Q(description__icontains=search) |
-                Q(notes__icontains=search) |
-                Q(transaction_id__icontains=search) |
-                Q(balance__icontains=search) |
-                Q(deposit__icontains=search) |
-                Q(withdraw__icontains=search)
-            )
+            queryset = queryset.filter(transaction_search_q(search, self.request.user))
         if date:
             queryset = queryset.filter(date=date)
         if company_account:
@@ -1295,6 +1184,7 @@ class TransactionViewSet(viewsets.ModelViewSet):
             
         return queryset
 
+    @serialize_writes
     def perform_create(self, serializer):
         # Calculate balance based on previous transactions for the same account
         company_account = serializer.validated_data.get('company_account')
@@ -1318,6 +1208,7 @@ class TransactionViewSet(viewsets.ModelViewSet):
         # Update balances for all subsequent transactions
         self._update_subsequent_balances(company_account, date, serializer.instance.id)
     
+    @serialize_writes
     def perform_update(self, serializer):
         # Recalculate balance for updated transaction
         company_account = serializer.validated_data.get('company_account')
@@ -1994,7 +1885,9 @@ class TransactionViewSet(viewsets.ModelViewSet):
     #         return Response({'error': str(e)}, status=400)
         
     ####################### gmo
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['post'], throttle_classes=[ScopedRateThrottle], throttle_scope='import')
+    @admit('bulk_import')
+    @serialize_writes
     def bulk_import(self, request):
         from datetime import datetime
         import csv
@@ -2140,6 +2033,8 @@ class TransactionViewSet(viewsets.ModelViewSet):
                 ))
 
             Transaction.objects.bulk_create(transactions)
+            generations.bump(Transaction, request.user.id)
+            changes.record(Transaction, request.user.id, [row.pk for row in transactions])
 
             return Response({
                 'message': f'Successfully imported {len(transactions)} transactions',
@@ -0,0 +1,87 @@
+"""Per-endpoint concurrency limits for CPU- and IO-heavy views.
+
+``admit(name)`` lets at most ``ADMISSION_LIMITS[name]`` calls of a view run
+at once in this process. Further calls queue and are then refused with ``429
+Too Many Requests`` and ``Retry-After: ADMISSION_RETRY_AFTER``, so a burst of
+exports can occupy only a bounded number of workers and ordinary CRUD keeps the
+rest. Sync views hold a worker thread while they queue, so they only wait
+``ADMISSION_SYNC_QUEUE_TIMEOUT`` (a fraction of a second) before failing fast;
+async views wait up to ``ADMISSION_QUEUE_TIMEOUT`` seconds.
+
+Per-user request rates are limited separately by DRF throttle scopes
+(``DEFAULT_THROTTLE_RATES``). Heavy viewset actions opt in with
+``@action(..., throttle_classes=[ScopedRateThrottle], throttle_scope='...')``;
+``@action`` only accepts attributes the view class already defines, which is
+why those viewsets declare ``throttle_scope = None``.
+"""
+import asyncio
+import threading
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from rest_framework import exceptions
+
+_lock = threading.Lock()
+_gates = {}
+
+
+class Saturated(exceptions.Throttled):
+    default_detail = 'Too many of these requests are running, try again later.'
+
+
+def gate(name):
+    """The semaphore bounding concurrent calls of ``name``."""
+    limit = settings.ADMISSION_LIMITS[name]
+    with _lock:
+        semaphore = _gates.get((name, limit))
+        if semaphore is None:
+            semaphore = _gates[(name, limit)] = threading.BoundedSemaphore(limit)
+    return semaphore
+
+
+async def _aacquire(semaphore, timeout):
+    # Poll instead of blocking in sync_to_async: each waiter would park a
+    # default-executor thread, the same pool the heavy views build in.
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delay = 0.005
+    while not semaphore.acquire(blocking=False):
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return False
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.1)
+    return True
+
+
+def admit(name):
+    """Run the decorated view (sync or async) under the ``name`` gate; raise ``Saturated`` when full."""
+
+    def decorator(func):
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                semaphore = gate(name)
+                if not await _aacquire(semaphore, settings.ADMISSION_QUEUE_TIMEOUT):
+                    raise Saturated(wait=settings.ADMISSION_RETRY_AFTER)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    semaphore.release()
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            semaphore = gate(name)
+            if not semaphore.acquire(timeout=settings.ADMISSION_SYNC_QUEUE_TIMEOUT):
+                raise Saturated(wait=settings.ADMISSION_RETRY_AFTER)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                semaphore.release()
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,78 @@
+"""Native async endpoints for read-heavy GETs.
+
+DRF 3.14 views are sync only, so under project.asgi each request to them is
+run through ``sync_to_async``. ``AsyncAPIView`` is a plain Django class-based
+view with ``async`` handlers that keeps the API contract of the DRF views it
+replaces: the same ``DEFAULT_AUTHENTICATION_CLASSES``, an authenticated user
+required, DRF-shaped error bodies and ORJSONRenderer output. Only the
+authenticator itself (a cached token lookup) runs in a thread; handlers use
+the async ORM and cache API. Under WSGI the views still work through
+``async_to_sync``.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.settings import api_settings
+from rest_framework.throttling import ScopedRateThrottle
+
+from project.renderers import ORJSONRenderer
+
+
+def json_response(data, status=status.HTTP_200_OK, headers=None):
+    return HttpResponse(ORJSONRenderer().render(data), status=status, headers=headers, content_type='application/json')
+
+
+async def aauthenticate(request):
+    """The user authenticated by the first DRF authenticator that accepts ``request``, or None."""
+    # Set by force_authenticate in tests and by project.batch for sub-requests, as DRF's Request honours it.
+    forced = getattr(request, '_force_auth_user', None)
+    if forced is not None:
+        return forced
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        authenticator = authentication_class()
+        result = await sync_to_async(authenticator.authenticate)(request)
+        if result is not None:
+            return result[0]
+    return None
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncAPIView(View):
+    """Async handlers (``async def get``) with DRF authentication; ``request.user`` is set before dispatch.
+
+    ``Throttled`` (including project.admission's ``Saturated``) becomes a 429 with ``Retry-After``.
+    """
+    throttle_scope = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            user = await aauthenticate(request)
+        except exceptions.AuthenticationFailed as e:
+            return self.not_authenticated(request, str(e.detail))
+        if user is None or not user.is_authenticated:
+            return self.not_authenticated(request, str(exceptions.NotAuthenticated.default_detail))
+        request.user = user
+        try:
+            await self.check_throttles(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.Throttled as e:
+            headers = {'Retry-After': '%d' % e.wait} if e.wait else None
+            return json_response({'detail': str(e.detail)}, status=status.HTTP_429_TOO_MANY_REQUESTS, headers=headers)
+
+    async def check_throttles(self, request):
+        """Apply ``ScopedRateThrottle`` when the view sets ``throttle_scope``, like a DRF view would."""
+        if self.throttle_scope is None:
+            return
+        throttle = ScopedRateThrottle()
+        if not await sync_to_async(throttle.allow_request)(request, self):
+            raise exceptions.Throttled(throttle.wait())
+
+    def not_authenticated(self, request, detail):
+        authenticator = api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]()
+        return json_response(
+            {'detail': detail}, status=status.HTTP_401_UNAUTHORIZED,
+            headers={'WWW-Authenticate': authenticator.authenticate_header(request)},
+        )
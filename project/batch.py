@@ -0,0 +1,150 @@
+"""``POST /api/batch/``: several API calls in one round-trip.
+
+The body is ``{"requests": [{"method", "path", "body"}, ...], "atomic": false}``.
+Each sub-request is resolved against ``ROOT_URLCONF`` and dispatched straight
+to its view, in order, as the user the batch itself authenticated (no
+per-call token lookup). Middleware does not run for sub-requests, so paths must
+be exact (trailing slash included).
+
+The response lists ``{"status", "headers", "body"}`` per sub-request. JSON
+bodies are embedded as JSON, text as a string and anything else (PDF, xlsx)
+base64-encoded with ``"encoding": "base64"``. With ``"atomic": true`` the
+batch runs in one transaction (holding the SQLite write lock) and stops at the
+first sub-request answering 400 or above; everything it wrote is rolled back
+and ``rolled_back`` is true. Atomic sub-requests bypass the generation-keyed
+caches and ETags (``generations.uncommitted``).
+"""
+import base64
+import json
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.handlers.exception import response_for_exception
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from project import generations
+from project.write_lock import serialized_writes
+
+METHODS = {'GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+class BatchError(Exception):
+    pass
+
+
+def _error(status_code, message):
+    return {'status': status_code, 'headers': {'Content-Type': 'application/json'}, 'body': {'error': message}}
+
+
+def _sub_request(request, method, path, body):
+    """A request for ``path`` carrying the batch's headers, its user and ``body`` as JSON."""
+    url = urlsplit(path)
+    content = b'' if body is None else json.dumps(body).encode('utf-8')
+    environ = {key: value for key, value in request.META.items() if not key.startswith('wsgi.')}
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': url.path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(content)),
+        'wsgi.input': BytesIO(content),
+        'wsgi.url_scheme': request.scheme,
+    })
+    sub_request = WSGIRequest(environ)
+    # Picked up by DRF's Request (and AsyncAPIView) in place of the authenticators.
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    return sub_request
+
+
+def _encode(response):
+    if response.status_code == status.HTTP_304_NOT_MODIFIED or not response.content:
+        return {}
+    content_type = response.get('Content-Type', '')
+    if content_type.startswith('application/json'):
+        return {'body': json.loads(response.content)}
+    if content_type.startswith('text/'):
+        return {'body': response.content.decode(response.charset)}
+    return {'body': base64.b64encode(response.content).decode('ascii'), 'encoding': 'base64'}
+
+
+def dispatch(request, method, path, body=None):
+    """Run one sub-request and return its ``{"status", "headers", "body"}`` entry."""
+    try:
+        match = resolve(urlsplit(path).path)
+    except Resolver404:
+        return _error(status.HTTP_404_NOT_FOUND, f'No endpoint matches {path}')
+    if getattr(match.func, 'view_class', None) is BatchView:
+        return _error(status.HTTP_400_BAD_REQUEST, 'Batches cannot be nested')
+
+    sub_request = _sub_request(request, method, path, body)
+    view = async_to_sync(match.func) if iscoroutinefunction(match.func) else match.func
+    try:
+        response = view(sub_request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+    except Exception as e:
+        response = response_for_exception(sub_request, e)
+    if response.streaming:
+        response.close()
+        return _error(status.HTTP_400_BAD_REQUEST, f'{path} streams its response and cannot be batched')
+    return {'status': response.status_code, 'headers': dict(response.items()), **_encode(response)}
+
+
+def _parse(payload):
+    entries = payload.get('requests') if isinstance(payload, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise BatchError('requests must be a non-empty list')
+    if len(entries) > settings.BATCH_MAX_REQUESTS:
+        raise BatchError(f'At most {settings.BATCH_MAX_REQUESTS} requests per batch')
+    parsed = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise BatchError('Each request must be an object')
+        method = str(entry.get('method', 'GET')).upper()
+        path = entry.get('path')
+        if method not in METHODS:
+            raise BatchError(f'Unsupported method {method}')
+        if not isinstance(path, str) or not path.startswith('/'):
+            raise BatchError('Each request needs an absolute path')
+        parsed.append((method, path, entry.get('body')))
+    return parsed
+
+
+class BatchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            entries = _parse(request.data)
+        except BatchError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not request.data.get('atomic'):
+            return Response({
+                'rolled_back': False,
+                'responses': [dispatch(request, *entry) for entry in entries],
+            })
+
+        responses = []
+        # Reads in the batch may see its uncommitted writes, so they must not
+        # fill (or be answered from) the shared generation-keyed caches.
+        with serialized_writes(), transaction.atomic(), generations.uncommitted():
+            for entry in entries:
+                responses.append(dispatch(request, *entry))
+                if responses[-1]['status'] >= 400:
+                    transaction.set_rollback(True)
+                    break
+        return Response({
+            'rolled_back': responses[-1]['status'] >= 400,
+            'responses': responses,
+        })
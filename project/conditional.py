@@ -0,0 +1,99 @@
+"""Conditional GET for viewsets, driven by per-user table generations.
+
+The ETag of a read is derived from the request path and query string plus the
+current generations of every table the payload is built from, so computing it
+costs a cache lookup and no query. A matching ``If-None-Match`` is answered
+with ``304 Not Modified`` before the queryset is evaluated or serialized.
+"""
+import hashlib
+from functools import wraps
+
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from project import generations
+
+
+def _opaque(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def etag_matches(etag, header):
+    """Weak comparison of ``etag`` against an If-None-Match header value."""
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    return '*' in candidates or _opaque(etag) in {_opaque(candidate) for candidate in candidates}
+
+
+def conditional(method):
+    """Answer a GET handler with 304 when the client's copy is current, else tag its response."""
+
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        if generations.bypassed():
+            # Generations lag behind uncommitted writes; such responses carry no ETag.
+            return method(self, request, *args, **kwargs)
+        etag = self.get_etag(request)
+        if etag_matches(etag, request.headers.get('If-None-Match')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        response = method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+    return wrapper
+
+
+def aconditional(method):
+    """``conditional`` for the async handlers of project.async_views.AsyncAPIView."""
+
+    @wraps(method)
+    async def wrapper(self, request, *args, **kwargs):
+        if generations.bypassed():
+            return await method(self, request, *args, **kwargs)
+        etag = await self.aget_etag(request)
+        if etag_matches(etag, request.headers.get('If-None-Match')):
+            return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        response = await method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+    return wrapper
+
+
+def _etag(request, generation):
+    raw = '{}:{}:{}'.format(request.user.pk, request.get_full_path(), generation)
+    return 'W/"{}"'.format(hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20])
+
+
+class ETagMixin:
+    """``get_etag`` for views whose GET handlers are wrapped with ``conditional``.
+
+    ``etag_models`` lists every table whose rows appear in the payload (nested
+    and ``source=`` fields included); it defaults to the queryset's model, except
+    for ``aget_etag`` (async views have no queryset), which requires it.
+    """
+    etag_models = None
+
+    def get_etag(self, request):
+        models = self.etag_models or (self.get_queryset().model,)
+        return _etag(request, generations.get_many(models, request.user.pk))
+
+    async def aget_etag(self, request):
+        return _etag(request, await generations.aget_many(self.etag_models, request.user.pk))
+
+
+class ConditionalGetMixin(ETagMixin):
+    """ETag / If-None-Match support for ``list`` and ``retrieve``; custom GET actions add ``conditional``."""
+
+    @conditional
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
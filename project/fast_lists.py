@@ -0,0 +1,124 @@
+"""Read-only ``values()`` fast path for list endpoints.
+
+A viewset opts in by declaring ``list_fields``: ``(output name, lookup)``
+pairs in the serializer's field order, e.g. ``('category_name',
+'category__name')``. ``list`` then selects exactly those columns with
+``values()`` and maps each row to a dict, skipping model instances and the
+serializer field machinery. The output matches the serializer's:
+
+* DecimalField columns become strings, as DRF's DecimalField renders them.
+* A related lookup that comes back ``None`` is omitted, as DRF skips a
+  ``source='fk.attr'`` field when ``fk`` is null.
+* A lookup given as ``(key, lookup)`` pairs builds a nested object, or
+  ``None`` when its first lookup (the related id) is null. Values are passed
+  through unconverted, like the hand-built dicts in ``to_representation``.
+* A lookup of ``None`` is a placeholder filled in by an override of
+  ``map_list_rows`` (nested lists).
+
+``?fields=`` / ``?expand=`` (project.sparse) narrow the selected columns.
+Writes, ``retrieve`` and custom actions keep using the serializer.
+"""
+from functools import lru_cache
+
+from django.db import models
+from rest_framework.response import Response
+
+from project.sparse import selected_fields
+from project.timing import measure
+
+PLACEHOLDER, VALUE, RELATED, NESTED = range(4)
+
+
+def _decimal_to_str(value):
+    return None if value is None else '{:f}'.format(value)
+
+
+def _target_field(model, lookup):
+    field = None
+    for part in lookup.split('__'):
+        field = model._meta.get_field(part)
+        if field.is_relation:
+            model = field.related_model
+    return field
+
+
+@lru_cache(maxsize=256)
+def compile_fields(model, list_fields):
+    """``(output, kind, lookup, convert)`` per field, resolved once per model and field set."""
+    columns = []
+    for output, lookup in list_fields:
+        if lookup is None:
+            columns.append((output, PLACEHOLDER, None, None))
+        elif isinstance(lookup, tuple):
+            columns.append((output, NESTED, lookup, None))
+        else:
+            convert = _decimal_to_str if isinstance(_target_field(model, lookup), models.DecimalField) else None
+            columns.append((output, RELATED if '__' in lookup else VALUE, lookup, convert))
+    return tuple(columns)
+
+
+def column_lookups(columns):
+    lookups = []
+    for _, kind, lookup, _ in columns:
+        if kind == NESTED:
+            lookups.extend(nested for _, nested in lookup)
+        elif kind != PLACEHOLDER:
+            lookups.append(lookup)
+    return lookups
+
+
+def map_rows(columns, rows):
+    """Map ``values()`` rows to output dicts using ``compile_fields`` columns."""
+    data = []
+    for row in rows:
+        item = {}
+        for output, kind, lookup, convert in columns:
+            if kind == PLACEHOLDER:
+                item[output] = None
+            elif kind == NESTED:
+                item[output] = None if row[lookup[0][1]] is None else {key: row[nested] for key, nested in lookup}
+            else:
+                value = row[lookup]
+                if value is None and kind == RELATED:
+                    continue
+                item[output] = convert(value) if convert is not None else value
+        data.append(item)
+    return data
+
+
+class ValuesListMixin:
+    list_fields = None
+
+    def list_columns(self):
+        serializer_class = self.get_serializer_class()
+        fields = tuple(self.list_fields)
+        selected = selected_fields(
+            self.request, [output for output, _ in fields], getattr(serializer_class, 'expandable_fields', ())
+        )
+        if selected is not None:
+            fields = tuple(field for field in fields if field[0] in selected)
+        return compile_fields(serializer_class.Meta.model, fields)
+
+    def values_queryset(self, queryset):
+        lookups = column_lookups(self.list_columns())
+        # The id (for map_list_rows overrides) and keyset cursor columns are
+        # selected whether or not they are part of the output.
+        for field in ('id',) + tuple(getattr(self, 'keyset_ordering', ())):
+            if field.lstrip('-') not in lookups:
+                lookups.append(field.lstrip('-'))
+        return queryset.values(*lookups)
+
+    def map_list_rows(self, rows):
+        return map_rows(self.list_columns(), rows)
+
+    def list(self, request, *args, **kwargs):
+        if self.list_fields is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.values_queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else list(queryset)
+        with measure('serialize'):
+            data = self.map_list_rows(rows)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -0,0 +1,99 @@
+"""SQLite FTS5 search indexes for the ``search`` query params.
+
+Each indexed table ``<table>`` gets a trigram-tokenised FTS5 table
+``<table>_fts`` whose rowid is the source row id, kept in sync by triggers
+created in the owning app's migration (so ``bulk_create`` and ``update()`` are
+covered too). The trigram tokenizer matches substrings case-insensitively,
+including Japanese text, but needs at least three characters; shorter terms
+and non-SQLite databases fall back to the view's ``icontains`` filter.
+"""
+from functools import reduce
+from operator import or_
+
+from django.db import connection, migrations
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+MIN_TERM_LENGTH = 3
+
+
+def _create_sql(table, columns):
+    fts = f'{table}_fts'
+    cols = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    assignments = ', '.join(f'{column} = new.{column}' for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, tokenize='trigram')",
+        f'INSERT INTO {fts} (rowid, {cols}) SELECT id, {cols} FROM {table}',
+        f'CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN '
+        f'INSERT INTO {fts} (rowid, {cols}) VALUES (new.id, {new_values}); END',
+        f'CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN '
+        f'DELETE FROM {fts} WHERE rowid = old.id; END',
+        f'CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN '
+        f'UPDATE {fts} SET {assignments} WHERE rowid = old.id; END',
+    ]
+
+
+def _drop_sql(table):
+    fts = f'{table}_fts'
+    return [f'DROP TRIGGER IF EXISTS {fts}_{suffix}' for suffix in ('ai', 'ad', 'au')] + [
+        f'DROP TABLE IF EXISTS {fts}'
+    ]
+
+
+def create_index(table, columns):
+    """Migration operation creating (and back-filling) the FTS index for ``table``."""
+
+    def forwards(apps, schema_editor):
+        if schema_editor.connection.vendor == 'sqlite':
+            for sql in _create_sql(table, columns):
+                schema_editor.execute(sql)
+
+    def backwards(apps, schema_editor):
+        if schema_editor.connection.vendor == 'sqlite':
+            for sql in _drop_sql(table):
+                schema_editor.execute(sql)
+
+    return migrations.RunPython(forwards, backwards)
+
+
+def _match_expression(term):
+    term = term.strip()
+    if connection.vendor != 'sqlite' or len(term) < MIN_TERM_LENGTH:
+        return None
+    return '"' + term.replace('"', '""') + '"'
+
+
+def match_ids(table, term):
+    """Subquery of ``table`` ids whose indexed columns contain ``term``, or None if FTS can't be used."""
+    expression = _match_expression(term)
+    if expression is None:
+        return None
+    return RawSQL(f'SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH %s', [expression])
+
+
+def search_queryset(queryset, term, fallback, ranked=False):
+    """Filter ``queryset`` by ``term`` through its table's FTS index, or by ``fallback`` (a Q)."""
+    table = queryset.model._meta.db_table
+    ids = match_ids(table, term)
+    if ids is None:
+        return queryset.filter(fallback)
+    queryset = queryset.filter(pk__in=ids)
+    if ranked:
+        rank = RawSQL(
+            f'SELECT rank FROM {table}_fts WHERE {table}_fts MATCH %s AND {table}_fts.rowid = {table}.id',
+            [_match_expression(term)],
+        )
+        queryset = queryset.annotate(search_rank=rank).order_by('search_rank', 'id')
+    return queryset
+
+
+def any_match(term, **lookups):
+    """OR of ``<lookup>__in=<table ids>`` filters, e.g. ``any_match(term, pk='expenses', restaurant_id='restaurants')``."""
+    conditions = []
+    for lookup, table in lookups.items():
+        ids = match_ids(table, term)
+        if ids is None:
+            return None
+        conditions.append(Q(**{f'{lookup}__in': ids}))
+    return reduce(or_, conditions)
@@ -0,0 +1,233 @@
+"""Per-user table generation counters for cache keys.
+
+Every tracked model has a generation per owning user, stored in the shared
+cache and replaced with a fresh token whenever one of that user's rows is saved
+or deleted (after the surrounding transaction commits). Values cached from a
+table include the current generation in their key, so a write makes them
+unreachable and no explicit invalidation is needed. Writes that bypass signals
+(``bulk_create``, ``QuerySet.update``) must call ``bump`` themselves.
+
+Generations live in their own cache alias (``GENERATIONS_CACHE``) backed by
+``GenerationFileCache``: one small file per (table, user), never culled, so a
+bump doesn't pay for the directory scan ``FileBasedCache`` does on every set.
+Bumps are coalesced per transaction: however many rows a transaction writes,
+each (table, user) generation is replaced once, when it commits.
+
+Tokens are random rather than incremented because the file cache has no atomic
+``incr``: two concurrent bumps may race, but either result is a new value.
+
+``acached`` also coalesces concurrent misses for the same key within a process,
+so a burst of identical report requests right after a write builds once.
+
+Inside ``uncommitted()`` (an atomic batch, project.batch) generation-keyed
+caches are neither read nor filled: the generations there don't reflect the
+transaction's own writes yet, and a rollback would never bump them.
+"""
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import secrets
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.connection import ConnectionProxy
+
+KEY = 'generation:{label}:{user_id}'
+
+_flights_lock = threading.Lock()
+_flights = {}
+
+_uncommitted = ContextVar('generations_uncommitted', default=False)
+
+
+class GenerationFileCache(FileBasedCache):
+    """``FileBasedCache`` without culling, for the bounded set of generation keys."""
+
+    def _cull(self):
+        pass
+
+
+counters = ConnectionProxy(caches, settings.GENERATIONS_CACHE)
+
+
+@contextmanager
+def uncommitted():
+    """Bypass the generation-keyed caches for reads that may see uncommitted writes."""
+    token = _uncommitted.set(True)
+    try:
+        yield
+    finally:
+        _uncommitted.reset(token)
+
+
+def bypassed():
+    return _uncommitted.get()
+
+
+def _key(model, user_id):
+    return KEY.format(label=model._meta.label_lower, user_id=user_id)
+
+
+def _token():
+    return secrets.token_hex(6)
+
+
+def get(model, user_id):
+    """Current generation of ``model`` rows owned by ``user_id``."""
+    return get_many([model], user_id)
+
+
+def get_many(models, user_id):
+    """Combined generation of several tables, for values built from all of them."""
+    keys = [_key(model, user_id) for model in models]
+    found = counters.get_many(keys)
+    for key in keys:
+        if key not in found:
+            counters.add(key, _token(), None)
+            found[key] = counters.get(key)
+    return '.'.join(str(found[key]) for key in keys)
+
+
+async def aget_many(models, user_id):
+    keys = [_key(model, user_id) for model in models]
+    found = await counters.aget_many(keys)
+    for key in keys:
+        if key not in found:
+            await counters.aadd(key, _token(), None)
+            found[key] = await counters.aget(key)
+    return '.'.join(str(found[key]) for key in keys)
+
+
+class _Pending(set):
+    def __init__(self, hooks, savepoints):
+        super().__init__()
+        self.hooks = hooks
+        self.savepoints = savepoints
+
+
+def _flush(connection, keys):
+    if getattr(connection, 'generation_bumps', None) is keys:
+        del connection.generation_bumps
+    counters.set_many({key: _token() for key in keys}, None)
+
+
+def bump(model, user_id):
+    """Invalidate everything cached from ``model`` rows owned by ``user_id``, once the transaction commits."""
+    if user_id is None:
+        return
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        counters.set(_key(model, user_id), _token(), None)
+        return
+    # Keys pending for this transaction (or savepoint) are flushed by a single
+    # on_commit callback. Commit and rollback (including a savepoint's) replace
+    # connection.run_on_commit, which marks the pending set as stale.
+    pending = getattr(connection, 'generation_bumps', None)
+    scope = (connection.run_on_commit, tuple(connection.savepoint_ids))
+    if pending is None or pending.hooks is not scope[0] or pending.savepoints != scope[1]:
+        pending = connection.generation_bumps = _Pending(*scope)
+        transaction.on_commit(partial(_flush, connection, pending))
+    pending.add(_key(model, user_id))
+
+
+
+def _cached_key(name, user_id, generation, params):
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    return 'cached:{}:{}:{}:{}'.format(name, user_id, generation, digest)
+
+
+def cached(name, user_id, models, build, params=None, timeout=300):
+    """Return ``build()`` cached under ``name``, ``params`` and the generations of ``models``."""
+    if bypassed():
+        return build()
+    key = _cached_key(name, user_id, get_many(models, user_id), params)
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, timeout)
+    return value
+
+
+class _Abandoned(Exception):
+    """The leader of a flight was cancelled before producing a value."""
+
+
+async def _single_flight(key, build):
+    """Await ``build()`` once per ``key`` in this process; concurrent callers share its result.
+
+    Flights are ``concurrent.futures`` futures so callers on other event loops
+    (``async_to_sync`` under WSGI) can join them too.
+    """
+    while True:
+        with _flights_lock:
+            future = _flights.get(key)
+            leader = future is None
+            if leader:
+                future = _flights[key] = concurrent.futures.Future()
+                future.set_running_or_notify_cancel()
+        if leader:
+            break
+        try:
+            return await asyncio.wrap_future(future)
+        except _Abandoned:
+            continue
+
+    try:
+        value = await build()
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(value)
+        return value
+    finally:
+        if not future.done():
+            future.set_exception(_Abandoned())
+        with _flights_lock:
+            del _flights[key]
+
+
+async def acached(name, user_id, models, build, params=None, timeout=300):
+    """``cached`` for async views: ``build`` is a coroutine function, awaited on a miss.
+
+    Concurrent misses for the same key (name, user, generations and params)
+    wait for a single ``build`` instead of each running it.
+    """
+    if bypassed():
+        return await build()
+    key = _cached_key(name, user_id, await aget_many(models, user_id), params)
+    value = await cache.aget(key)
+    if value is None:
+
+        async def build_and_store():
+            result = await build()
+            await cache.aset(key, result, timeout)
+            return result
+
+        value = await _single_flight(key, build_and_store)
+    return value
+
+
+def _bump_sender(sender, instance, owner, **kwargs):
+    bump(sender, owner(instance))
+
+
+def track(*models, owner=attrgetter('user_id')):
+    """Bump the owner's generation of each model on post_save/post_delete.
+
+    ``owner`` maps an instance to its user id; the default reads ``user_id``.
+    """
+    for model in models:
+        receiver = partial(_bump_sender, owner=owner)
+        label = model._meta.label_lower
+        post_save.connect(receiver, sender=model, weak=False, dispatch_uid=f'generation:{label}:save')
+        post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f'generation:{label}:delete')
@@ -1,6 +1,256 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import hashlib
+import json
+from collections import OrderedDict
+from functools import partial, reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Page, Paginator as DjangoPaginator
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from project import generations
+
+# Query params that select a page or shape the rows rather than filter them.
+PAGING_PARAMS = {'page', 'pageSize', 'cursor', 'pagination', 'count', 'fields', 'expand'}
+COUNT_TIMEOUT = 300
+
+
+def count_cache_key(queryset, request, view, models=None):
+    """Key for the count of ``queryset``, tied to the generations of ``models``.
+
+    ``models`` are every table the filters read (joins and subqueries
+    included); they default to the view's ``etag_models``, else the queryset's
+    model.
+    """
+    models = models or getattr(view, 'etag_models', None) or (queryset.model,)
+    filters = sorted(
+        (key, value) for key, values in request.query_params.lists() if key not in PAGING_PARAMS for value in values
+    )
+    digest = hashlib.sha1(json.dumps(filters).encode('utf-8')).hexdigest()
+    return 'count:{}:{}:{}:{}:{}'.format(
+        type(view).__name__ if view is not None else '',
+        getattr(view, 'action', ''),
+        request.user.pk,
+        generations.get_many(models, request.user.pk),
+        digest,
+    )
+
+
+def _count(queryset, limit):
+    if limit is None:
+        return queryset.count(), True
+    count = queryset.order_by()[:limit + 1].count()
+    return (count, True) if count <= limit else (limit, False)
+
+
+def cached_count(queryset, request, view, limit=None, models=None):
+    """Count ``queryset`` once per filter set and table generation.
+
+    With ``limit`` the count stops at ``limit`` rows; the result is then
+    ``(limit, False)`` meaning "at least ``limit``". Returns ``(count, exact)``.
+    """
+    if generations.bypassed():
+        return _count(queryset, limit)
+    key = count_cache_key(queryset, request, view, models)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    result = _count(queryset, limit)
+    cache.set(key, result, COUNT_TIMEOUT)
+    return result
+
+
+def _ordering_field(model, path):
+    """The model field at the end of an ordering path such as ``company_account__bank_name``."""
+    *relations, name = path.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+class KnownCountPaginator(DjangoPaginator):
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.__dict__['count'] = count
+
 
 class CustomPageNumberPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'pageSize'
     max_page_size = 100
+
+
+class CachedCountPagination(CustomPageNumberPagination):
+    """Page-number pagination that reuses the row count across pages of the same filtered list.
+
+    Counts are cached per (view, user, table generation, filters). When one of
+    ``bounded_count_params`` is used (free-text search), counting stops at
+    ``count_limit`` rows and the response carries ``count_exact: false``; pages
+    are then fetched with one extra row to tell whether a next page exists, so
+    paging continues past the capped count.
+    """
+    count_limit = 5000
+    bounded_count_params = ('search',)
+    count_models = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        bounded = any(request.query_params.get(param) for param in self.bounded_count_params)
+        count, self.count_exact = cached_count(
+            queryset, request, view, limit=self.count_limit if bounded else None, models=self.count_models
+        )
+        self.count = count
+        if not self.count_exact:
+            return self.paginate_open_ended(queryset, request)
+        self.django_paginator_class = partial(KnownCountPaginator, count=count)
+        return super().paginate_queryset(queryset, request, view)
+
+    def paginate_open_ended(self, queryset, request):
+        page_size = self.get_page_size(request)
+        page_number = request.query_params.get(self.page_query_param, 1)
+        try:
+            number = int(page_number)
+            if number < 1:
+                raise ValueError(number)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message='Invalid page.'))
+        offset = (number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and number > 1:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message='That page contains no results'))
+        # Counting the peeked row gives the paginator a next page exactly when one exists.
+        paginator = KnownCountPaginator(queryset, page_size, count=offset + len(rows))
+        self.page = Page(rows[:page_size], number, paginator)
+        self.request = request
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if not self.count_exact:
+            response.data['count'] = max(self.count, response.data['count'])
+            response.data['count_exact'] = False
+        return response
+
+
+class KeysetPagination(BasePagination):
+    """Forward-only keyset pagination over a composite ordering such as ``('-date', '-id')``.
+
+    The cursor holds the ordering values of the last row, so every page is an
+    index seek (``WHERE (date, id) < (?, ?)``) no matter how deep it is. The
+    ordering comes from ``ordering`` or the view's ``keyset_ordering`` and must
+    end in a unique field. ``?count=true`` adds the total row count.
+    """
+    page_size = 10
+    page_size_query_param = 'pageSize'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = None
+    count_models = None
+
+    def get_ordering(self, view):
+        return self.ordering or view.keyset_ordering
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request, model):
+        """The ordering values held by the request's cursor, converted by their model fields."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError(values)
+            values = [
+                _ordering_field(model, field).to_python(value) for field, value in zip(self.fields, values)
+            ]
+            if any(value is None for value in values):
+                raise ValueError(values)
+        except (TypeError, ValueError, ValidationError, FieldDoesNotExist):
+            raise NotFound('Invalid cursor')
+        return values
+
+    def encode_cursor(self, row):
+        values = []
+        for field in self.fields:
+            value = row[field] if isinstance(row, dict) else getattr(row, field)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return base64.urlsafe_b64encode(json.dumps(values, default=str).encode('ascii')).decode('ascii')
+
+    def after_cursor(self, values):
+        # (a, b) < (x, y)  ==  a < x OR (a = x AND b < y), per field direction.
+        conditions = []
+        for position, (field, descending) in enumerate(zip(self.fields, self.descending)):
+            equal = {self.fields[i]: values[i] for i in range(position)}
+            lookup = 'lt' if descending else 'gt'
+            conditions.append(Q(**equal, **{f'{field}__{lookup}': values[position]}))
+        return reduce(or_, conditions)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = self.get_ordering(view)
+        self.fields = [field.lstrip('-') for field in ordering]
+        self.descending = [field.startswith('-') for field in ordering]
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*ordering)
+        self.count = None
+        if request.query_params.get('count') in ('1', 'true'):
+            self.count = self.get_count(queryset, request, view)
+
+        values = self.decode_cursor(request, queryset.model)
+        if values is not None:
+            queryset = queryset.filter(self.after_cursor(values))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_count(self, queryset, request, view):
+        return cached_count(queryset, request, view, models=self.count_models)[0]
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict([('next', self.get_next_link())])
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['results'] = data
+        return Response(payload)
+
+
+class TransactionKeysetPagination(KeysetPagination):
+    ordering = ('-date', '-id')
+
+
+class ListPagination(CachedCountPagination):
+    """Page-number pagination, or keyset pagination when ``?pagination=cursor`` or a cursor is given."""
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if request.query_params.get('pagination') == 'cursor' or request.query_params.get('cursor'):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
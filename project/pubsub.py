@@ -0,0 +1,78 @@
+"""In-process publish/subscribe between sync writers and async listeners.
+
+Async views ``subscribe`` to a channel (e.g. ``('dashboard', user_id)``) and
+await notifications on an ``asyncio.Queue``; publishers can run in any thread
+and hand messages to the subscriber's event loop. Delivery is best effort and
+limited to this process: a listener connected to another worker only hears
+about writes made there, so consumers must treat a message as "something
+changed, re-read" rather than as the change itself.
+"""
+import asyncio
+import threading
+from contextlib import contextmanager
+from functools import partial
+from operator import attrgetter
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+QUEUE_SIZE = 16
+
+_lock = threading.Lock()
+_subscribers = {}
+
+
+@contextmanager
+def subscribe(channel):
+    """Yield a queue receiving the messages published to ``channel`` while the block runs.
+
+    Must be entered from a coroutine. A slow listener loses messages once its
+    queue is full rather than holding up publishers.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(QUEUE_SIZE)
+    subscriber = (loop, queue)
+    with _lock:
+        _subscribers.setdefault(channel, set()).add(subscriber)
+    try:
+        yield queue
+    finally:
+        with _lock:
+            listeners = _subscribers.get(channel)
+            if listeners is not None:
+                listeners.discard(subscriber)
+                if not listeners:
+                    del _subscribers[channel]
+
+
+def _deliver(queue, message):
+    if not queue.full():
+        queue.put_nowait(message)
+
+
+def publish(channel, message=None):
+    """Send ``message`` to every current subscriber of ``channel``; safe from any thread."""
+    with _lock:
+        listeners = list(_subscribers.get(channel, ()))
+    for loop, queue in listeners:
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(_deliver, queue, message)
+
+
+def publish_on_commit(channel, message=None):
+    transaction.on_commit(partial(publish, channel, message))
+
+
+def _publish_sender(sender, instance, topic, owner, **kwargs):
+    user_id = owner(instance)
+    if user_id is not None:
+        publish_on_commit((topic, user_id), sender._meta.label_lower)
+
+
+def track(topic, *models, owner=attrgetter('user_id')):
+    """Publish to ``(topic, owner id)`` after a save or delete of each model commits."""
+    for model in models:
+        receiver = partial(_publish_sender, topic=topic, owner=owner)
+        label = model._meta.label_lower
+        post_save.connect(receiver, sender=model, weak=False, dispatch_uid=f'pubsub:{topic}:{label}:save')
+        post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f'pubsub:{topic}:{label}:delete')
@@ -58,6 +58,7 @@ INSTALLED_APPS += [
 ]
 
 MIDDLEWARE = [
+    'project.timing.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -91,13 +92,63 @@ WSGI_APPLICATION = 'project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# DB_PROFILE=production turns on WAL, relaxed fsync, larger page cache/mmap and
+# persistent connections. Benchmark with `manage.py benchmark_sqlite`.
+DB_PROFILE = os.environ.get('DB_PROFILE', 'development')
+
+SQLITE_PRAGMAS = {
+    'development': {},
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,  # KiB, i.e. 64 MB
+        'mmap_size': 268435456,  # 256 MB
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+    },
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'project.sqlite_backend',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600 if DB_PROFILE == 'production' else 0,
+        'CONN_HEALTH_CHECKS': DB_PROFILE == 'production',
+        'OPTIONS': {
+            'pragmas': SQLITE_PRAGMAS[DB_PROFILE],
+        },
     }
 }
 
+# Queue heavy write endpoints (imports, order creation, balance recomputes)
+# behind one writer at a time across worker processes; see project.write_lock.
+SQLITE_WRITE_LOCK = os.environ.get('SQLITE_WRITE_LOCK', '1' if DB_PROFILE == 'production' else '0') == '1'
+SQLITE_WRITE_LOCK_PATH = BASE_DIR / 'db.sqlite3.writelock'
+
+# Shared across worker processes; values are keyed by per-user table
+# generations (project.generations), so writes never need to clear it.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', BASE_DIR / 'django_cache'),
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
+    },
+    # project.generations: table generation counters, kept apart from the
+    # cached values so setting one never culls or scans them.
+    'generations': {
+        'BACKEND': 'project.generations.GenerationFileCache',
+        'LOCATION': os.path.join(os.environ.get('CACHE_LOCATION', BASE_DIR / 'django_cache'), 'generations'),
+        'TIMEOUT': None,
+    },
+}
+GENERATIONS_CACHE = 'generations'
+
+# Tests run against a process-local cache so entries never outlive the test database.
+TEST_RUNNER = 'project.test_runner.TestRunner'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -144,10 +195,66 @@ AUTH_USER_MODEL = 'account.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'apps.account.authentication.CachedTokenAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'project.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'project.pagination.CustomPageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'project.pagination.CachedCountPagination',
     'PAGE_SIZE': 10,
+    # Per-user rates of the heavy endpoints (throttle_scope on their actions).
+    'DEFAULT_THROTTLE_RATES': {
+        'invoice': '30/min',
+        'export': '10/min',
+        'report': '20/min',
+        'import': '10/hour',
+    },
 }
+
+# CachedTokenAuthentication: per-process key -> user cache.
+TOKEN_CACHE_SIZE = 1000
+TOKEN_CACHE_TTL = 60
+
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 CORS_ALLOW_ALL_ORIGINS = True
+
+# Translation endpoints: upstream client and size of the in-process LRU in front of the translations table.
+TRANSLATOR_CLASS = os.environ.get('TRANSLATOR_CLASS', 'googletrans.Translator')
+TRANSLATION_CACHE_SIZE = 5000
+
+# Async translate-batch upstream (apps.revenue.translate_client).
+TRANSLATION_UPSTREAM_URL = os.environ.get('TRANSLATION_UPSTREAM_URL', 'https://translate.googleapis.com/translate_a/t')
+TRANSLATION_CHUNK_SIZE = 20
+TRANSLATION_MAX_CONCURRENCY = 4
+TRANSLATION_TIMEOUT = 5
+TRANSLATION_BREAKER_THRESHOLD = 5
+TRANSLATION_BREAKER_RESET = 30
+
+# Dashboard event stream (apps.revenue.live_views): comment line every
+# SSE_HEARTBEAT seconds so proxies keep idle connections open, and a reconnect
+# after SSE_MAX_AGE seconds.
+SSE_HEARTBEAT = 15
+SSE_MAX_AGE = 300
+
+# POST /api/batch/ (project.batch): sub-requests accepted per batch.
+BATCH_MAX_REQUESTS = 20
+
+# project.admission: concurrent calls allowed per process for each heavy
+# endpoint, how long further calls queue (async views, sync views), and the
+# Retry-After sent on 429.
+ADMISSION_LIMITS = {
+    'generate_invoice': 2,
+    'export_pdf': 2,
+    'financial_report': 2,
+    'bulk_import': 1,
+    'bulk_import_xls_expenses': 1,
+}
+ADMISSION_QUEUE_TIMEOUT = 5
+ADMISSION_SYNC_QUEUE_TIMEOUT = 0.25
+ADMISSION_RETRY_AFTER = 10
+
+# project.timing: requests slower than this, or issuing at least this many
+# queries, are logged as warnings on the project.timing logger.
+REQUEST_TIMING_SLOW_MS = int(os.environ.get('REQUEST_TIMING_SLOW_MS', 1000))
+REQUEST_TIMING_SLOW_QUERIES = int(os.environ.get('REQUEST_TIMING_SLOW_QUERIES', 50))
@@ -0,0 +1,36 @@
+"""Sparse fieldsets: ``?fields=`` and ``?expand=`` on GET requests.
+
+``fields`` lists the output fields to return. A serializer's
+``expandable_fields`` (nested lists and objects) are only returned when named
+in ``fields`` or ``expand``, except when neither parameter is given, which keeps
+the full legacy payload. Unknown names are ignored.
+"""
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _names(value):
+    return {name.strip() for name in value.split(',') if name.strip()} if value else set()
+
+
+def selected_fields(request, names, expandable=()):
+    """The subset of ``names`` (in order) requested by ``request``, or None for all of them."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    params = request.query_params
+    if 'fields' not in params and 'expand' not in params:
+        return None
+    chosen = _names(params.get('fields')) or {name for name in names if name not in expandable}
+    chosen |= _names(params.get('expand')) & set(expandable)
+    return [name for name in names if name in chosen]
+
+
+class SparseFieldsetMixin:
+    """Drop the fields a GET request didn't ask for from a ModelSerializer."""
+    expandable_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = selected_fields(self.context.get('request'), list(self.fields), self.expandable_fields)
+        if selected is not None:
+            for name in set(self.fields) - set(selected):
+                self.fields.pop(name)
@@ -0,0 +1,30 @@
+"""Base test case for the API tests in apps/*/tests.py."""
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from apps.account.models import User
+
+
+class OwnerTestCase(TestCase):
+    """Runs each test as the ``owner`` user with an empty cache and an authenticated ``APIClient``.
+
+    The client uses ``force_authenticate``; with ``token_auth`` it sends the
+    owner's ``Token`` instead, for tests that go through the authenticator.
+    """
+    token_auth = False
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='owner', email='owner@example.com', password='secret')
+        if cls.token_auth:
+            cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        if self.token_auth:
+            self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        else:
+            self.client.force_authenticate(self.user)
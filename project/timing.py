@@ -0,0 +1,150 @@
+"""Per-request SQL and timing instrumentation, reported as ``Server-Timing``.
+
+``ServerTimingMiddleware`` starts a ``RequestTimings`` for each request and
+adds a header such as::
+
+    Server-Timing: db;dur=12.4;desc="7 queries", serialize;dur=3.1, render;dur=80.2, total;dur=101.7
+
+* ``db``: every query, timed by ``record_query``, which the SQLite backend
+  (project.sqlite_backend) installs as an ``execute_wrapper`` on each
+  connection. Installing it per connection instead of per request also covers
+  the async views, whose queries run on executor threads with their own
+  connections; outside a request it only costs a context variable lookup.
+* ``serialize``: ``serializer.data`` of serializers using
+  ``TimedSerializerMixin``, JSON rendering and the values() list mapping.
+* ``render``: PDF and XLSX builds, wrapped in ``measure('render')``.
+
+Requests slower than ``REQUEST_TIMING_SLOW_MS`` or issuing at least
+``REQUEST_TIMING_SLOW_QUERIES`` queries are logged as warnings on the
+``project.timing`` logger, without credentials passed in the query string
+(``SENSITIVE_PARAMS``).
+"""
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import urlencode
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_timings', default=None)
+
+SENSITIVE_PARAMS = {'token', 'key', 'api_key', 'access_token', 'password', 'secret', 'signature'}
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.durations = defaultdict(float)
+        self.running = set()
+
+    def add(self, name, seconds):
+        self.durations[name] += seconds
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def header(self, total):
+        parts = ['db;dur={:.1f};desc="{} queries"'.format(self.durations['db'] * 1000, self.queries)]
+        parts.extend(
+            '{};dur={:.1f}'.format(name, seconds * 1000)
+            for name, seconds in self.durations.items() if name != 'db'
+        )
+        parts.append('total;dur={:.1f}'.format(total * 1000))
+        return ', '.join(parts)
+
+
+@contextmanager
+def measure(name):
+    """Add the time spent in the block to the current request's ``name`` entry.
+
+    Nested blocks of the same name (a serializer inside a serializer) are
+    counted once, by the outermost one.
+    """
+    timings = _current.get()
+    if timings is None or name in timings.running:
+        yield
+        return
+    timings.running.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.running.discard(name)
+        timings.add(name, time.perf_counter() - started)
+
+
+class TimedSerializerMixin:
+    """Count building a serializer's representation (``serializer.data``) as ``serialize`` time."""
+
+    def to_representation(self, instance):
+        with measure('serialize'):
+            return super().to_representation(instance)
+
+
+def loggable_path(request):
+    """``request``'s path and query string without ``SENSITIVE_PARAMS``."""
+    params = [
+        (key, value) for key, values in request.GET.lists() if key.lower() not in SENSITIVE_PARAMS
+        for value in values
+    ]
+    return request.path + ('?' + urlencode(params) if params else '')
+
+
+def record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.add('db', time.perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings)
+
+    def finish(self, request, response, timings):
+        total = timings.total()
+        response['Server-Timing'] = timings.header(total)
+        if total * 1000 >= settings.REQUEST_TIMING_SLOW_MS or timings.queries >= settings.REQUEST_TIMING_SLOW_QUERIES:
+            logger.warning(
+                'Slow request %s %s: %d in %.0f ms, %d queries (%.0f ms SQL)',
+                request.method, loggable_path(request), response.status_code, total * 1000,
+                timings.queries, timings.durations['db'] * 1000,
+                extra={'status_code': response.status_code},
+            )
+        return response
@@ -17,9 +17,16 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from apps.revenue.bootstrap_views import BootstrapView
+from apps.revenue.changes_views import ChangesView
+from project.batch import BatchView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/account/', include('apps.account.urls')),
+    path('api/batch/', BatchView.as_view(), name='batch'),
+    path('api/bootstrap/', BootstrapView.as_view(), name='bootstrap'),
+    path('api/changes/', ChangesView.as_view(), name='changes'),
     path('api/', include('apps.expense.urls')),
     path('api/revenue/', include('apps.revenue.urls')),
 ]
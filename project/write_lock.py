@@ -0,0 +1,55 @@
+"""Opt-in serialisation of heavy SQLite write paths.
+
+SQLite allows one writer at a time. When several workers start large write
+transactions together, the losers either wait out ``busy_timeout`` or fail
+with "database is locked" (always, in WAL mode, when a read transaction tries
+to upgrade to a write). With ``SQLITE_WRITE_LOCK`` enabled the decorated
+endpoints queue on a per-process lock plus an ``flock`` on
+``SQLITE_WRITE_LOCK_PATH`` instead, so only one of them writes at a time and
+plain reads are unaffected.
+"""
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only.
+    fcntl = None
+
+_process_lock = threading.RLock()
+_state = threading.local()
+
+
+@contextmanager
+def serialized_writes():
+    if not settings.SQLITE_WRITE_LOCK:
+        yield
+        return
+
+    with _process_lock:
+        depth = getattr(_state, 'depth', 0)
+        _state.depth = depth + 1
+        try:
+            if depth or fcntl is None:
+                yield
+                return
+            with open(settings.SQLITE_WRITE_LOCK_PATH, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            _state.depth = depth
+
+
+def serialize_writes(func):
+    """Run a view method while holding the write lock."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with serialized_writes():
+            return func(*args, **kwargs)
+    return wrapper